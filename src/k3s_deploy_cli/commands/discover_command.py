@@ -7,6 +7,7 @@ and can update the application's configuration with the discovered nodes.
 """
 
 import json
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -22,6 +23,16 @@ from ..proxmox_core import get_proxmox_api_client
 from ..proxmox_vm_discovery import discover_k3s_nodes
 
 
+# Fields of a discovered node that are written to the config.json 'nodes' array
+_CONFIG_NODE_KEYS = ("vmid", "role")
+_get_config_node_fields = itemgetter(*_CONFIG_NODE_KEYS)
+
+
+def _to_config_node(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a discovered node onto the fields stored in config.json."""
+    return dict(zip(_CONFIG_NODE_KEYS, _get_config_node_fields(node)))
+
+
 def handle_discover_command(
     config: K3sDeployCLIConfig,
     console: Console,
@@ -87,10 +98,7 @@ def _handle_json_output(
 ) -> None:
     """Handle JSON format output for discovered nodes."""
     # Prepare JSON output with only the required fields for config.json
-    config_nodes = []
-    for node in discovered_nodes:
-        config_node = {"vmid": node["vmid"], "role": node["role"]}
-        config_nodes.append(config_node)
+    config_nodes = [_to_config_node(node) for node in discovered_nodes]
 
     json_output = json.dumps(config_nodes, indent=2)
 
@@ -7,6 +7,7 @@ The provision command only provisions VMs that exist in the configuration and
 never performs node discovery.
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional, Set
 
 from loguru import logger
@@ -15,6 +16,12 @@ from ..config import K3sDeployCLIConfig
 from ..exceptions import ConfigurationError
 from ..proxmox_vm_provision import provision_vm
 
+# Upper bound on VMs provisioned at once, to keep SSH sessions per Proxmox host modest
+_MAX_PROVISION_WORKERS = 8
+
+# Logged for each requested VMID that has no entry in the config.json 'nodes' array
+_UNCONFIGURED_VMID_MSG = "VMID {} is not configured in config.json and will be skipped"
+
 
 def parse_vmid_string(vmid_string: str) -> List[int]:
     """
@@ -61,11 +68,23 @@ def filter_configured_vmids(requested_vmids: List[int], configured_vmids: Set[in
     Returns:
         Tuple of (configured_vmids, unconfigured_vmids) as lists
     """
-    configured = [vmid for vmid in requested_vmids if vmid in configured_vmids]
-    unconfigured = [vmid for vmid in requested_vmids if vmid not in configured_vmids]
+    configured: List[int] = []
+    unconfigured: List[int] = []
+    # Single pass with O(1) set membership per requested VMID
+    for vmid in requested_vmids:
+        if vmid in configured_vmids:
+            configured.append(vmid)
+        else:
+            unconfigured.append(vmid)
     return configured, unconfigured
 
 
+def _provision_one(config: K3sDeployCLIConfig, vmid: int) -> bool:
+    """Provision a single VM; runs on a worker thread of handle_provision_command."""
+    logger.info(f"Provisioning VM {vmid}...")
+    return provision_vm(config=config, vm_id=vmid)
+
+
 def handle_provision_command(
     config: K3sDeployCLIConfig,
     vmids: Optional[List[int]] = None,
@@ -76,7 +95,7 @@ def handle_provision_command(
     This function provisions VMs with cloud-init configuration by:
     1. Determining which VMs to provision (from VMIDs or all configured)
     2. Filtering to only VMs that exist in config.json
-    3. Provisioning each configured VM
+    3. Provisioning each configured VM, several at a time
     4. Reporting any unconfigured VMIDs
     
     Args:
@@ -102,7 +121,7 @@ def handle_provision_command(
         if vmids:
             # Report that requested VMIDs are not configured
             for vmid in vmids:
-                logger.warning(f"VMID {vmid} is not configured in config.json and will be skipped")
+                logger.warning(_UNCONFIGURED_VMID_MSG.format(vmid))
             return True
         else:
             logger.info("No nodes configured in config.json - nothing to provision")
@@ -114,12 +133,15 @@ def handle_provision_command(
         vms_to_provision = list(configured_vmids)
         logger.info(f"No specific VMIDs provided - provisioning all {len(vms_to_provision)} configured VMs")
     else:
-        # Filter requested VMIDs to only those that are configured
-        vms_to_provision, unconfigured_vmids = filter_configured_vmids(vmids, configured_vmids)
+        # Filter requested VMIDs to only those that are configured. Repeated VMIDs are
+        # dropped so the same VM is never provisioned twice at once.
+        vms_to_provision, unconfigured_vmids = filter_configured_vmids(
+            list(dict.fromkeys(vmids)), configured_vmids
+        )
         
         # Report unconfigured VMIDs
         for vmid in unconfigured_vmids:
-            logger.warning(f"VMID {vmid} is not configured in config.json and will be skipped")
+            logger.warning(_UNCONFIGURED_VMID_MSG.format(vmid))
         
         if not vms_to_provision:
             logger.info("No configured VMs found in the requested VMIDs")
@@ -127,30 +149,37 @@ def handle_provision_command(
         
         logger.info(f"Provisioning {len(vms_to_provision)} configured VMs: {vms_to_provision}")
     
-    # Provision each configured VM
+    # Provision each configured VM. provision_vm blocks on Proxmox API and SSH
+    # round-trips, so independent VMs are provisioned concurrently.
     success_count = 0
     failure_count = 0
+    max_workers = min(len(vms_to_provision), _MAX_PROVISION_WORKERS)
     
-    for vmid in vms_to_provision:
-        try:
-            logger.info(f"Provisioning VM {vmid}...")
-            result = provision_vm(config=config, vm_id=vmid)
-            
-            if result:
-                logger.info(f"Successfully provisioned VM {vmid}")
-                success_count += 1
-            else:
-                logger.error(f"Failed to provision VM {vmid}")
-                failure_count += 1
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_provision_one, config, vmid): vmid for vmid in vms_to_provision
+        }
+        
+        for future in as_completed(futures):
+            vmid = futures[future]
+            try:
+                result = future.result()
                 
-        except Exception as e:
-            # If we're only provisioning a single VM, re-raise the exception
-            # If we're provisioning multiple VMs, log and continue
-            if len(vms_to_provision) == 1:
-                raise
-            else:
-                logger.error(f"Failed to provision VM {vmid}: {e}")
-                failure_count += 1
+                if result:
+                    logger.info(f"Successfully provisioned VM {vmid}")
+                    success_count += 1
+                else:
+                    logger.error(f"Failed to provision VM {vmid}")
+                    failure_count += 1
+                    
+            except Exception as e:
+                # If we're only provisioning a single VM, re-raise the exception
+                # If we're provisioning multiple VMs, log and continue
+                if len(vms_to_provision) == 1:
+                    raise
+                else:
+                    logger.error(f"Failed to provision VM {vmid}: {e}")
+                    failure_count += 1
     
     # Report summary
     total_requested = len(vms_to_provision)
@@ -8,27 +8,64 @@ the loaded configuration against a predefined schema to ensure correctness.
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, TypeAlias  # Import TypeAlias
+from typing import Any, Dict, Optional, TypeAlias  # Import TypeAlias
 
 from dotenv import load_dotenv
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 from loguru import logger
 
 from .exceptions import ConfigurationError
 
+try:  # Optional C-accelerated JSON parser; falls back to the standard library.
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on installed extras
+    _json_loads = json.loads
+
 # Define K3sDeployCLIConfig as a type alias for the configuration dictionary
 K3sDeployCLIConfig: TypeAlias = Dict[str, Any]
 
+
+@lru_cache(maxsize=4)
+def _get_schema_validator(schema_bytes: bytes) -> Validator:
+    """Builds (and caches) a validator for the given schema document.
+
+    The schema is checked against its meta-schema only once per distinct
+    schema document; subsequent calls reuse the compiled validator.
+
+    Args:
+        schema_bytes: Raw JSON content of the schema file.
+
+    Returns:
+        A jsonschema validator instance for the schema.
+
+    Raises:
+        json.JSONDecodeError: If the schema text is not valid JSON.
+        jsonschema.exceptions.SchemaError: If the schema itself is invalid.
+    """
+    schema_data = _json_loads(schema_bytes)
+    validator_cls = validator_for(schema_data)
+    validator_cls.check_schema(schema_data)
+    return validator_cls(schema_data)
+
+
 def load_configuration(
-    config_file_path: Path, schema_file_path: Path
+    config_file_path: Path,
+    schema_file_path: Path,
+    dotenv_path: Optional[Path] = None,
 ) -> K3sDeployCLIConfig: # Use the type alias here
     """Loads, validates, and processes the application configuration.
 
     Args:
         config_file_path: Path to the configuration JSON file.
         schema_file_path: Path to the configuration schema JSON file.
+        dotenv_path: Optional explicit path to a .env file. When given, it is
+                     loaded directly and the CWD/package .env lookup is skipped.
 
     Returns:
         A dictionary containing the validated configuration.
@@ -40,11 +77,16 @@ def load_configuration(
     logger.debug(f"Attempting to load configuration from: {config_file_path}")
     logger.debug(f"Using schema for validation: {schema_file_path}")
 
-    # Load .env file from the project root (if it exists)
-    # Assumes this script is run from a context where the project root is discoverable
-    # or that .env is in the current working directory or its parents.
+    # Load .env file from an explicit path if given, otherwise from the project
+    # root (if it exists). The latter assumes this script is run from a context
+    # where the project root is discoverable or that .env is in the current
+    # working directory or its parents.
     project_root_env = Path(os.getcwd()) / ".env"
-    if project_root_env.exists():
+    if dotenv_path is not None:
+        logger.debug(f"Loading environment variables from {dotenv_path}")
+        loaded_dotenv = load_dotenv(dotenv_path=dotenv_path, override=True)
+        logger.debug(f"python-dotenv load_dotenv returned: {loaded_dotenv}")
+    elif project_root_env.exists():
         logger.debug(f"Loading environment variables from {project_root_env}")
         # Log relevant env vars BEFORE load_dotenv if they might exist
         logger.debug(f"Value of DOTENV_PROXMOX_HOST before load_dotenv: {os.getenv('DOTENV_PROXMOX_HOST')}")
@@ -101,8 +143,8 @@ def load_configuration(
         raise ConfigurationError(msg) # This is more of an internal error
 
     try:
-        with open(config_file_path, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
+        with open(config_file_path, "rb") as f:
+            config_data = _json_loads(f.read())
         logger.debug("Successfully loaded configuration file.")
     except json.JSONDecodeError as e:
         msg = f"Error decoding JSON from '{config_file_path}': {e}"
@@ -114,8 +156,8 @@ def load_configuration(
         raise ConfigurationError(msg) from e
 
     try:
-        with open(schema_file_path, "r", encoding="utf-8") as f:
-            schema_data = json.load(f)
+        with open(schema_file_path, "rb") as f:
+            schema_validator = _get_schema_validator(f.read())
         logger.debug("Successfully loaded schema file.")
     except json.JSONDecodeError as e:
         msg = f"Error decoding JSON from schema '{schema_file_path}': {e}"
@@ -156,7 +198,9 @@ def load_configuration(
 
 
     try:
-        validate(instance=config_data, schema=schema_data)
+        error = best_match(schema_validator.iter_errors(config_data))
+        if error is not None:
+            raise error
         logger.debug("Configuration validated successfully against schema.")
     except ValidationError as e:
         # Provide a more user-friendly error message for validation issues
@@ -1,4 +1,5 @@
 # file: src/k3s_deploy_cli/constants.py
-from typing import List
+from typing import Final, Tuple
 
-K3S_TAGS: List[str] = ["k3s-server", "k3s-agent", "k3s-storage"]
\ No newline at end of file
+# A tuple, so the tag contract cannot be changed at runtime
+K3S_TAGS: Final[Tuple[str, ...]] = ("k3s-server", "k3s-agent", "k3s-storage")
@@ -8,6 +8,7 @@ appropriate command handlers. It serves as the central orchestrator for the CLI.
 
 import sys
 from pathlib import Path
+from typing import Optional
 
 from loguru import logger
 from rich.console import Console
@@ -28,8 +29,16 @@ from .exceptions import ConfigurationError, K3sDeployCLIError
 from .logging_config import configure_logging
 
 
-def main() -> None:
-    """Main entry point for the K3s Deploy CLI."""
+def main(console: Optional[Console] = None) -> int:
+    """Main entry point for the K3s Deploy CLI.
+
+    Args:
+        console: Rich Console to render command output with. When omitted, one
+                 is created only if the dispatched command needs it.
+
+    Returns:
+        The process exit code; the console script passes it to sys.exit().
+    """
     # Parse command-line arguments
     args = parse_args()
 
@@ -44,11 +53,8 @@ def main() -> None:
         logger.info(
             f"No command specified. Use '{APP_NAME} --help' for available commands."
         )
-        sys.exit(1)
+        return 1
 
-    # Initialize console for output
-    console = Console()
-    
     try:
         # Load configuration
         schema_file_path = Path(__file__).parent / "config_schema.json"
@@ -64,37 +70,49 @@ def main() -> None:
         logger.debug(f"Loaded application configuration: {config_for_logging}")
 
         # Dispatch to appropriate command handler
-        _dispatch_command(args, config, console)
+        exit_code = _dispatch_command(args, config, console)
 
     except ConfigurationError as e:
         logger.error(f"Configuration error: {e}")
         if args.debug:
             logger.opt(exception=True).debug("Configuration error traceback:")
-        sys.exit(1)
+        return 1
     except K3sDeployCLIError as e:
         logger.error(f"CLI Error: {e}")
         if args.debug:
             logger.opt(exception=True).debug("CLI error traceback:")
-        sys.exit(1)
+        return 1
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
         if args.debug:
             logger.opt(exception=True).debug("Unexpected error traceback:")
-        sys.exit(1)
+        return 1
 
     logger.debug(f"{APP_NAME} finished.")
-    sys.exit(0)
+    return exit_code
+
 
+# Commands whose handlers render output through a Rich Console
+_CONSOLE_COMMANDS = frozenset({"info", "discover"})
 
-def _dispatch_command(args, config, console) -> None:
+
+def _dispatch_command(args, config, console=None) -> int:
     """
     Dispatch the parsed command to the appropriate handler.
 
     Args:
         args: Parsed command-line arguments.
         config: Loaded application configuration.
-        console: Rich Console instance for output.
+        console: Rich Console instance for output. Created on demand for the
+                 commands that need one when not supplied.
+
+    Returns:
+        The exit code for main() to return: 0 on success, 1 on an invalid VMID
+        or failed provisioning, 2 for an unknown command.
     """
+    if console is None and args.command in _CONSOLE_COMMANDS:
+        console = Console()
+
     if args.command == "info":
         info_command = InfoCommand(config, console)
         info_command.execute(discover=getattr(args, "discover", False))
@@ -115,17 +133,19 @@ def _dispatch_command(args, config, console) -> None:
                 vmids = parse_vmid_string(args.vmid)
             except ValueError as e:
                 logger.error(f"Invalid VMID format: {e}")
-                sys.exit(1)
+                return 1
         
         # Call the provision command handler
         success = handle_provision_command(config, vmids)
         if not success:
-            sys.exit(1)
+            return 1
     else:
         # This should not be reached if subparsers are defined correctly
         logger.warning(f"Unknown command: {args.command}")
-        sys.exit(2)
+        return 2
+
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -7,6 +7,7 @@ and fetch specific details about Proxmox nodes like DNS and snippet storage.
 """
 import hashlib
 import json
+import threading
 import warnings
 from typing import Any, Dict, List, Optional
 
@@ -22,6 +23,8 @@ warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
 # Module-level cache for proxmox clients
 _PROXMOX_CLIENTS: Dict[str, ProxmoxAPI] = {}
+# Serialises cache lookups and client creation when VMs are provisioned concurrently
+_PROXMOX_CLIENTS_LOCK = threading.Lock()
 
 def _clear_client_cache() -> None:
     """
@@ -31,7 +34,8 @@ def _clear_client_cache() -> None:
     test isolation when testing the singleton pattern behavior.
     """
     global _PROXMOX_CLIENTS
-    _PROXMOX_CLIENTS.clear()
+    with _PROXMOX_CLIENTS_LOCK:
+        _PROXMOX_CLIENTS.clear()
 
 def _get_config_hash(config: Dict[str, Any]) -> str:
     """
@@ -87,51 +91,52 @@ def get_proxmox_api_client(config: Dict[str, Any]) -> ProxmoxAPI:
     if not host or not user:
         raise ConfigurationError("Proxmox host and user must be configured.")
     
-    # Check if we already have a client with this configuration
-    config_hash = _get_config_hash(config)
-    if config_hash in _PROXMOX_CLIENTS:
-        logger.debug(f"Reusing existing Proxmox API connection to {host}")
-        return _PROXMOX_CLIENTS[config_hash]
-
-    auth_kwargs: Dict[str, Any] = {"user": user, "verify_ssl": verify_ssl, "timeout": timeout}
-
-    if password:
-        auth_kwargs["password"] = password
-    elif api_token_id and api_token_secret:
-        # For API tokens, the user should be in the format 'tokenid@realm!tokenname'
-        # Proxmoxer expects the full api_token_id as the 'user' and api_token_secret as 'password'
-        # Ensure the user field is correctly formatted if it's an API token ID.
-        # The proxmoxer library handles this by passing the token ID as user and secret as password.
-        auth_kwargs["user"] = api_token_id
-        auth_kwargs["password"] = api_token_secret
-    else:
-        raise ConfigurationError(
-            "Proxmox authentication not configured. "
-            "Provide 'password' or both 'api_token_id' and 'api_token_secret'."
-        )
-
-    try:
-        logger.debug(
-            f"Attempting to connect to Proxmox API at {host} "
-            f"with user {auth_kwargs['user']}"
-        )
-        proxmox = ProxmoxAPI(host, **auth_kwargs)
-        proxmox.version.get() # Test connection
-        logger.info(f"Successfully connected to Proxmox API at {host}")
+    with _PROXMOX_CLIENTS_LOCK:
+        # Check if we already have a client with this configuration
+        config_hash = _get_config_hash(config)
+        if config_hash in _PROXMOX_CLIENTS:
+            logger.debug(f"Reusing existing Proxmox API connection to {host}")
+            return _PROXMOX_CLIENTS[config_hash]
+
+        auth_kwargs: Dict[str, Any] = {"user": user, "verify_ssl": verify_ssl, "timeout": timeout}
+
+        if password:
+            auth_kwargs["password"] = password
+        elif api_token_id and api_token_secret:
+            # For API tokens, the user should be in the format 'tokenid@realm!tokenname'
+            # Proxmoxer expects the full api_token_id as the 'user' and api_token_secret as 'password'
+            # Ensure the user field is correctly formatted if it's an API token ID.
+            # The proxmoxer library handles this by passing the token ID as user and secret as password.
+            auth_kwargs["user"] = api_token_id
+            auth_kwargs["password"] = api_token_secret
+        else:
+            raise ConfigurationError(
+                "Proxmox authentication not configured. "
+                "Provide 'password' or both 'api_token_id' and 'api_token_secret'."
+            )
+
+        try:
+            logger.debug(
+                f"Attempting to connect to Proxmox API at {host} "
+                f"with user {auth_kwargs['user']}"
+            )
+            proxmox = ProxmoxAPI(host, **auth_kwargs)
+            proxmox.version.get() # Test connection
+            logger.info(f"Successfully connected to Proxmox API at {host}")
         
-        # Store the client in the cache
-        _PROXMOX_CLIENTS[config_hash] = proxmox
-        return proxmox
-    except ResourceException as e:
-        logger.error(f"Proxmox API resource error for {host}: {e.status_code} - {e.content}")
-        raise ProxmoxInteractionError(
-            f"Proxmox API error for {host}: {e.status_code} - {e.content}"
-        ) from e
-    except Exception as e:
-        logger.error(f"Failed to connect to Proxmox API at {host}: {e}")
-        raise ProxmoxInteractionError(
-            f"Failed to connect to Proxmox API at {host}: {e}"
-        ) from e
+            # Store the client in the cache
+            _PROXMOX_CLIENTS[config_hash] = proxmox
+            return proxmox
+        except ResourceException as e:
+            logger.error(f"Proxmox API resource error for {host}: {e.status_code} - {e.content}")
+            raise ProxmoxInteractionError(
+                f"Proxmox API error for {host}: {e.status_code} - {e.content}"
+            ) from e
+        except Exception as e:
+            logger.error(f"Failed to connect to Proxmox API at {host}: {e}")
+            raise ProxmoxInteractionError(
+                f"Failed to connect to Proxmox API at {host}: {e}"
+            ) from e
 
 def get_cluster_status(proxmox_client: ProxmoxAPI) -> List[Dict[str, Any]]:
     """
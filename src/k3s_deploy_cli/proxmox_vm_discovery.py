@@ -9,9 +9,8 @@ import os
 import tempfile
 import uuid  # Added for more unique temp filenames
 import warnings
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-import paramiko
 from loguru import logger
 from proxmoxer.core import (
     ResourceException,
@@ -22,6 +21,9 @@ from .constants import K3S_TAGS
 from .exceptions import ProxmoxInteractionError
 from .proxmox_core import ProxmoxAPI, get_cluster_status
 
+if TYPE_CHECKING:
+    import paramiko
+
 # Suppress InsecureRequestWarning when verify_ssl is False
 warnings.filterwarnings("ignore", category=InsecureRequestWarning)
 
@@ -369,7 +371,7 @@ def get_storage_info(proxmox_client: ProxmoxAPI, storage_name: str) -> Dict[str,
         ) from e
 
 
-def test_sftp_write_access(ssh_client: paramiko.SSHClient, remote_path: str) -> Dict[str, Any]:
+def test_sftp_write_access(ssh_client: "paramiko.SSHClient", remote_path: str) -> Dict[str, Any]:
     """
     Test SFTP write access to a remote directory by creating and removing a test file.
     
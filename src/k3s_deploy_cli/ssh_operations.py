@@ -8,13 +8,18 @@ It helps ensure that remote operations can be performed successfully.
 
 import re
 import socket
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
-import paramiko
 from loguru import logger
 
 from k3s_deploy_cli.exceptions import ConfigurationError, ProvisionError
 
+if TYPE_CHECKING:
+    import paramiko
+
+# paramiko is imported inside the functions that open SSH sessions; loading it
+# eagerly added ~30ms to every CLI invocation, including ones that never use SSH.
+
 
 def check_proxmox_ssh_connectivity(
     config: Dict[str, Any],
@@ -56,6 +61,8 @@ def check_proxmox_ssh_connectivity(
         # SSHConnectionError is not raised by this function directly anymore,
         # critical connection issues are reported in the "error" field of the result.
     """
+    import paramiko
+
     host: Optional[str] = config.get("host")
     if not host:
         raise ConfigurationError("Proxmox host must be configured for SSH connectivity check.")
@@ -206,7 +213,7 @@ def check_proxmox_ssh_connectivity(
     return result
 
 
-def establish_ssh_connection(config: Dict[str, Any]) -> paramiko.SSHClient:
+def establish_ssh_connection(config: Dict[str, Any]) -> "paramiko.SSHClient":
     """
     Establish an SSH connection to Proxmox host using available authentication methods.
 
@@ -225,6 +232,8 @@ def establish_ssh_connection(config: Dict[str, Any]) -> paramiko.SSHClient:
         SSHConnectionError: If SSH connection fails
         ConfigurationError: If required configuration is missing
     """
+    import paramiko
+
     from .exceptions import SSHConnectionError
     
     host = config.get("host")
@@ -352,7 +361,7 @@ def construct_node_hostname(base_hostname: str, node_name: str) -> str:
         return node_name  # Fallback to just the node name
 
 
-def establish_node_ssh_connection(config: Dict[str, Any], node_name: str) -> paramiko.SSHClient:
+def establish_node_ssh_connection(config: Dict[str, Any], node_name: str) -> "paramiko.SSHClient":
     """
     Establish SSH connection to a specific Proxmox node.
     
@@ -371,6 +380,8 @@ def establish_node_ssh_connection(config: Dict[str, Any], node_name: str) -> par
         SSHConnectionError: If SSH connection fails to both domain-based and fallback hostnames
         ConfigurationError: If required configuration is missing
     """
+    import paramiko
+
     from .exceptions import SSHConnectionError
     
     base_host = config.get("host")
@@ -0,0 +1,48 @@
+# file: tests/bench_discover_command.py
+"""Benchmarks for the discover command's JSON output path.
+
+The file name does not match ``test_*.py``, so the default test run skips it.
+Run it explicitly and serially with
+``poetry run pytest -n 0 tests/bench_discover_command.py``; under xdist the
+benchmark is skipped. Timing regressions are caught by comparing against a saved
+baseline (``--benchmark-compare-fail``), not by a fixed threshold here.
+"""
+
+import pytest
+
+from k3s_deploy_cli.commands.discover_command import _handle_json_output
+
+NODE_COUNT = 1000
+ROUNDS = 50
+
+
+@pytest.fixture(scope="module")
+def discovered_nodes():
+    """Provides a large discovery result, built once for the module."""
+    return [
+        {
+            'vmid': 100 + i,
+            'name': f'k3s-node-{i}',
+            'role': 'server' if i % 3 == 0 else 'agent',
+            'node': f'node{i % 4 + 1}',
+            'status': 'running',
+            'qga_enabled': True,
+            'qga_running': True,
+        }
+        for i in range(NODE_COUNT)
+    ]
+
+
+@pytest.mark.benchmark(group="json_output")
+def test_bench_handle_json_output_stdout(benchmark, discovered_nodes, recording_console):
+    """Measures projecting and serialising a large discovery result to stdout."""
+    if benchmark.disabled:
+        # pytest-benchmark switches itself off under xdist and runs pedantic() only once
+        pytest.skip("benchmarks are disabled; run with -n 0")
+    benchmark.pedantic(
+        _handle_json_output,
+        args=(discovered_nodes, recording_console, "stdout"),
+        rounds=ROUNDS,
+    )
+
+    assert recording_console.n == 4 * ROUNDS  # Heading, JSON, two hints per call
@@ -1,5 +1,6 @@
 """Shared pytest fixtures for the test suite."""
 
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
@@ -7,11 +8,17 @@ from loguru import logger
 from rich.console import Console
 
 
+def _frozen_records(*records):
+    """Returns API-style records as an immutable tuple of read-only mappings."""
+    return tuple(MappingProxyType(record) for record in records)
+
+
 class LogCapture:
     """Helper class for capturing log messages in tests."""
     
     def __init__(self):
         self.logs = []
+        self.enabled = False
 
     def write(self, message):
         self.logs.append(message)
@@ -20,74 +27,178 @@ class LogCapture:
         pass
 
 
-@pytest.fixture
-def capture_logs():
-    """Fixture for capturing log messages during tests."""
+@pytest.fixture(scope="session")
+def _log_capture_sink():
+    """Installs one loguru capture sink per session; it only records while enabled."""
     log_capture = LogCapture()
-    logger.add(log_capture, format="{message}", level="DEBUG")
-    return log_capture
+    handler_id = logger.add(
+        log_capture, format="{message}", level="DEBUG", filter=lambda _: log_capture.enabled
+    )
+    yield log_capture
+    logger.remove(handler_id)
 
 
 @pytest.fixture
+def capture_logs(_log_capture_sink):
+    """Fixture for capturing log messages during tests."""
+    _log_capture_sink.logs.clear()
+    _log_capture_sink.enabled = True
+    yield _log_capture_sink
+    _log_capture_sink.enabled = False
+
+
+@pytest.fixture(scope="session")
 def basic_proxmox_config():
-    """Provides a basic valid Proxmox configuration."""
-    return {
-        'proxmox': {
+    """Provides a basic valid Proxmox configuration, shared read-only across tests."""
+    return MappingProxyType({
+        'proxmox': MappingProxyType({
             'host': 'pve.example.com',
             'user': 'root@pam',
             'password': 'testpass'
-        }
-    }
+        })
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def full_config():
-    """Provides a complete configuration with nodes."""
-    return {
-        'proxmox': {
+    """Provides a complete configuration with nodes, shared read-only across tests."""
+    return MappingProxyType({
+        'proxmox': MappingProxyType({
             'host': 'pve.example.com',
             'user': 'root@pam',
             'password': 'testpass'
-        },
-        'nodes': [
+        }),
+        'nodes': _frozen_records(
             {'vmid': 100, 'role': 'server'},
             {'vmid': 101, 'role': 'agent'}
-        ]
-    }
+        )
+    })
+
+
+@pytest.fixture(scope="session")
+def base_global_cloud_init():
+    """Provides a read-only global cloud-init section shared across tests."""
+    return MappingProxyType({
+        'packages': ['git', 'curl'],
+        'package_update': True
+    })
+
+
+class RecordingConsole:
+    """Lightweight Console stand-in that records print() calls."""
+
+    __slots__ = ('n', 'calls')
+
+    def __init__(self):
+        self.n = 0
+        self.calls = []
+
+    def print(self, *args, **kwargs):
+        self.n += 1
+        self.calls.append((args, kwargs))
+
+
+@pytest.fixture(scope="session")
+def _console_spec():
+    """Provides the Rich Console attribute names, introspected once per session."""
+    return dir(Console)
 
 
 @pytest.fixture
-def mock_console():
+def mock_console(_console_spec):
     """Provides a mocked Rich Console instance."""
-    return MagicMock(spec=Console)
+    console = MagicMock(spec=_console_spec)
+    console.__class__ = Console
+    return console
+
+
+@pytest.fixture
+def recording_console():
+    """Provides a RecordingConsole for tests that only inspect printed output."""
+    return RecordingConsole()
+
+
+class FakeProxmoxClient:
+    """Lightweight Proxmox client stand-in that serves canned storage data and records GET paths."""
+
+    __slots__ = ('storage_list', 'storage_detail', 'calls')
+
+    def __init__(self):
+        self.storage_list = []
+        self.storage_detail = {}
+        self.calls = []
+
+    def configure(self, storage_list=(), storage_detail=None):
+        self.storage_list = list(storage_list)
+        self.storage_detail = storage_detail or {}
+        return self
+
+    def _get(self, path, response):
+        def get():
+            self.calls.append(path)
+            return response
+        return get
+
+    def nodes(self, node_name):
+        return SimpleNamespace(storage=SimpleNamespace(
+            get=self._get(f'nodes/{node_name}/storage', self.storage_list)
+        ))
+
+    def storage(self, storage_name):
+        return SimpleNamespace(get=self._get(f'storage/{storage_name}', self.storage_detail))
 
 
 @pytest.fixture
-def mock_proxmox_client():
-    """Provides a mocked Proxmox API client."""
+def fake_proxmox_client():
+    """Provides a FakeProxmoxClient for tests that only need canned storage data."""
+    return FakeProxmoxClient()
+
+
+@pytest.fixture(scope="module")
+def _proxmox_client_pool():
+    """Builds one Proxmox API client mock per test module."""
     return MagicMock()
 
 
 @pytest.fixture
+def mock_proxmox_client(_proxmox_client_pool):
+    """Provides a mocked Proxmox API client with calls, return values and side effects cleared."""
+    _proxmox_client_pool.reset_mock(return_value=True, side_effect=True)
+    return _proxmox_client_pool
+
+
+@pytest.fixture
+def mock_proxmox_vm(mock_proxmox_client):
+    """Provides the VM endpoint of mock_proxmox_client, i.e. what nodes(<node>).qemu(<vmid>) returns."""
+    return mock_proxmox_client.nodes.return_value.qemu.return_value
+
+
+@pytest.fixture(scope="session")
 def sample_cluster_status():
-    """Provides sample cluster status data."""
-    return [
+    """Provides sample cluster status data (read-only, shared)."""
+    return _frozen_records(
         {'type': 'cluster', 'name': 'test-cluster', 'quorate': 1},
         {'type': 'node', 'name': 'node1', 'online': 1, 'local': 1},
         {'type': 'node', 'name': 'node2', 'online': 1, 'local': 0}
-    ]
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def sample_online_node():
+    """Provides a single online Proxmox node as cluster nodes data (read-only, shared)."""
+    return _frozen_records({'name': 'node1', 'online': 1})
+
+
+@pytest.fixture(scope="session")
 def sample_version_info():
-    """Provides sample Proxmox version information."""
-    return {'version': '7.4', 'release': '1'}
+    """Provides sample Proxmox version information (read-only, shared)."""
+    return MappingProxyType({'version': '7.4', 'release': '1'})
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_vm_list():
-    """Provides a sample list of VMs with K3s tags."""
-    return [
+    """Provides a sample list of VMs with K3s tags (read-only, shared)."""
+    return _frozen_records(
         {
             'vmid': 100, 'name': 'k3s-server-1', 'status': 'running', 
             'node': 'node1', 'k3s_tag': 'k3s-server', 'role': 'server',
@@ -98,7 +209,7 @@ def sample_vm_list():
             'node': 'node2', 'k3s_tag': 'k3s-agent', 'role': 'agent', 
             'qga_enabled': True, 'qga_running': False, 'qga_version': 'N/A'
         }
-    ]
+    )
 
 
 @pytest.fixture
@@ -123,33 +234,33 @@ def proxmox_config_with_tokens():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_dns_info():
-    """Provides sample DNS information."""
-    return {
+    """Provides sample DNS information (read-only, shared)."""
+    return MappingProxyType({
         'search': 'example.com',
         'dns1': '8.8.8.8',
         'dns2': '8.8.4.4'
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_vm_status():
-    """Provides sample VM status data."""
-    return {
+    """Provides sample VM status data (read-only, shared)."""
+    return MappingProxyType({
         'status': 'running',
         'name': 'test-vm',
         'vmid': 100,
         'node': 'test-node',
         'uptime': 3600
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_node_list():
-    """Provides a sample list of cluster nodes."""
-    return [
+    """Provides a sample list of cluster nodes (read-only, shared)."""
+    return _frozen_records(
         {'node': 'node1', 'status': 'online', 'local': 1},
         {'node': 'node2', 'status': 'online', 'local': 0},
         {'node': 'node3', 'status': 'offline', 'local': 0}
-    ]
\ No newline at end of file
+    )
\ No newline at end of file
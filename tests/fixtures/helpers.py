@@ -10,8 +10,7 @@ from rich.console import Console
 def create_temp_json_file(tmp_path: Path, filename: str, content: Dict[str, Any]) -> Path:
     """Creates a temporary JSON file with the given content."""
     file_path = tmp_path / filename
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(content, f)
+    file_path.write_bytes(json.dumps(content).encode())
     return file_path
 
 
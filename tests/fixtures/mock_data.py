@@ -124,4 +124,8 @@ PROXMOX_SERVER_ERROR = {
     'status_code': 500,
     'reason': 'Internal Server Error',
     'content': 'internal server error'
-}
\ No newline at end of file
+}
+
+# Text that is guaranteed not to parse as JSON (ASCII, so every decoder path
+# fails with a JSONDecodeError rather than a UnicodeDecodeError)
+INVALID_JSON = "this is not valid json {{{{"
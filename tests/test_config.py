@@ -3,6 +3,7 @@
 
 import builtins  # Moved to top
 import os
+import re
 from pathlib import Path
 from typing import Any, Dict
 
@@ -15,14 +16,10 @@ from k3s_deploy_cli import (
 from k3s_deploy_cli.config import load_configuration
 from k3s_deploy_cli.exceptions import ConfigurationError
 from tests.fixtures.helpers import create_temp_json_file
+from tests.fixtures.mock_data import INVALID_JSON
 
 # --- Fixtures ---
 
-@pytest.fixture
-def tmp_path_factory_fixture(tmp_path_factory: Any) -> Any: # Renamed to avoid conflict
-    """Fixture to use the built-in tmp_path_factory."""
-    return tmp_path_factory
-
 @pytest.fixture
 def base_config_schema_content() -> Dict[str, Any]:
     """Provides the base content for the config schema."""
@@ -75,9 +72,9 @@ def temp_schema_file(tmp_path: Path, base_config_schema_content: Dict[str, Any])
     """Creates a temporary schema file for tests."""
     return create_temp_json_file(tmp_path, "test_schema.json", base_config_schema_content)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def minimal_valid_config_content() -> Dict[str, Any]:
-    """Provides minimal valid configuration content."""
+    """Provides minimal valid configuration content (read-only, shared)."""
     return {
         "proxmox": {
             "host": "pve.example.com",
@@ -94,10 +91,13 @@ def minimal_valid_config_content() -> Dict[str, Any]:
         }]
     }
 
-@pytest.fixture
-def temp_config_file_minimal(tmp_path: Path, minimal_valid_config_content: Dict[str, Any]) -> Path:
-    """Creates a temporary minimal valid config file."""
-    return create_temp_json_file(tmp_path, "config_minimal.json", minimal_valid_config_content)
+@pytest.fixture(scope="session")
+def temp_config_file_minimal(
+    tmp_path_factory: pytest.TempPathFactory, minimal_valid_config_content: Dict[str, Any]
+) -> Path:
+    """Creates a temporary minimal valid config file, shared across tests (read-only)."""
+    config_dir = tmp_path_factory.mktemp("cfg_min")
+    return create_temp_json_file(config_dir, "config_minimal.json", minimal_valid_config_content)
 
 # --- Test Cases ---
 
@@ -115,26 +115,22 @@ def test_load_minimal_valid_config(
 def test_config_file_not_found(tmp_path: Path, temp_schema_file: Path) -> None:
     """Tests that ConfigurationError is raised if config file is not found."""
     non_existent_config_path = tmp_path / "non_existent_config.json"
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(ConfigurationError, match="Configuration file not found"):
         load_configuration(non_existent_config_path, temp_schema_file)
-    assert "Configuration file not found" in str(excinfo.value)
 
 def test_schema_file_not_found(tmp_path: Path, temp_config_file_minimal: Path) -> None:
     """Tests that ConfigurationError is raised if schema file is not found."""
     non_existent_schema_path = tmp_path / "non_existent_schema.json"
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(ConfigurationError, match="Configuration schema file not found"):
         load_configuration(temp_config_file_minimal, non_existent_schema_path)
-    assert "Configuration schema file not found" in str(excinfo.value)
 
 def test_invalid_json_in_config_file(tmp_path: Path, temp_schema_file: Path) -> None:
     """Tests ConfigurationError for invalid JSON in the config file."""
     invalid_json_path = tmp_path / "invalid_config.json"
-    with open(invalid_json_path, "w", encoding="utf-8") as f:
-        f.write("this is not valid json")
-    
-    with pytest.raises(ConfigurationError) as excinfo:
+    invalid_json_path.write_bytes(INVALID_JSON.encode())
+
+    with pytest.raises(ConfigurationError, match="Error decoding JSON"):
         load_configuration(invalid_json_path, temp_schema_file)
-    assert "Error decoding JSON" in str(excinfo.value)
 
 def test_schema_validation_failure_missing_required_field(
     tmp_path: Path, temp_schema_file: Path
@@ -156,23 +152,19 @@ def test_schema_validation_failure_missing_required_field(
     }
     invalid_config_path = create_temp_json_file(tmp_path, "invalid_config.json", invalid_config_data)
     
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(
+        ConfigurationError,
+        match=r"Configuration validation error.*'host' is a required property",
+    ):
         load_configuration(invalid_config_path, temp_schema_file)
-    assert "Configuration validation error" in str(excinfo.value)
-    assert "'host' is a required property" in str(excinfo.value)
-
-@pytest.fixture
-def mock_env_vars(monkeypatch: Any) -> None:
-    """Mocks environment variables for testing ENV: prefix."""
-    monkeypatch.setenv("TEST_PROXMOX_HOST", "env.proxmox.host")
-    monkeypatch.setenv("TEST_PROXMOX_PASSWORD", "env_password")
-    monkeypatch.setenv("MY_HOST_VAR", "host.from.direct.env")
-    monkeypatch.setenv("MY_PASS_VAR", "pass.from.direct.env")
 
 def test_load_config_with_env_prefix(
-    tmp_path: Path, temp_schema_file: Path, mock_env_vars: None 
+    tmp_path: Path, temp_schema_file: Path, monkeypatch: Any
 ) -> None:
     """Tests loading configuration with ENV: prefix substitution."""
+    monkeypatch.setenv("TEST_PROXMOX_HOST", "env.proxmox.host")
+    monkeypatch.setenv("TEST_PROXMOX_PASSWORD", "env_password")
+
     config_with_env_data = {
         "proxmox": {
             "host": "ENV:TEST_PROXMOX_HOST",
@@ -190,23 +182,12 @@ def test_load_config_with_env_prefix(
     }
     config_path = create_temp_json_file(tmp_path, "config_env.json", config_with_env_data)
     
-    # Create a dummy .env file in the tmp_path (which will be CWD for the test)
-    # to ensure load_dotenv() in config.py doesn't fail if it expects one,
-    # though monkeypatch should handle the actual env var values.
-    # Alternatively, ensure config.py handles .env not found gracefully.
-    (tmp_path / ".env").touch()
-
-
-    original_cwd = Path.cwd()
-    os.chdir(tmp_path) # Change CWD to where .env might be sought by load_dotenv
-
-    try:
-        config = load_configuration(config_path, temp_schema_file)
-        assert config["proxmox"]["host"] == "env.proxmox.host"
-        assert config["proxmox"]["password"] == "env_password"
-        assert config["nodes"][0]["vmid"] == 200
-    finally:
-        os.chdir(original_cwd) # Restore CWD
+    # No .env file is created at dotenv_path; config.py handles a missing
+    # .env gracefully and monkeypatch provides the actual env var values.
+    config = load_configuration(config_path, temp_schema_file, dotenv_path=tmp_path / ".env")
+    assert config["proxmox"]["host"] == "env.proxmox.host"
+    assert config["proxmox"]["password"] == "env_password"
+    assert config["nodes"][0]["vmid"] == 200
 
 def test_load_config_with_dotenv_override_and_direct_env_vars(
     tmp_path: Path, temp_schema_file: Path, monkeypatch: Any
@@ -223,8 +204,7 @@ DOTENV_PROXMOX_HOST="host.from.dotenv.file"
 DOTENV_PROXMOX_PASSWORD="password.from.dotenv.file"
 """
     env_file_path = tmp_path / ".env"
-    with open(env_file_path, "w", encoding="utf-8") as f:
-        f.write(env_file_content)
+    env_file_path.write_bytes(env_file_content.encode())
 
     config_data = {
         "proxmox": {
@@ -236,19 +216,10 @@ DOTENV_PROXMOX_PASSWORD="password.from.dotenv.file"
     }
     config_path = create_temp_json_file(tmp_path, "config_dotenv_direct.json", config_data)
 
-    original_cwd = Path.cwd()
-    os.chdir(tmp_path)
-
-    try:
-        config = load_configuration(config_path, temp_schema_file)
-        assert config["proxmox"]["host"] == "host.from.dotenv.file"
-        assert config["proxmox"]["user"] == "user.from.config.json"
-        assert config["proxmox"]["password"] == "pass.from.direct.env.specific.for.this.test"
-    finally:
-        os.chdir(original_cwd)
-        monkeypatch.delenv("MY_HOST_VAR", raising=False)
-        monkeypatch.delenv("MY_PASS_VAR", raising=False)
-        monkeypatch.delenv("DOTENV_PROXMOX_HOST", raising=False)
+    config = load_configuration(config_path, temp_schema_file, dotenv_path=env_file_path)
+    assert config["proxmox"]["host"] == "host.from.dotenv.file"
+    assert config["proxmox"]["user"] == "user.from.config.json"
+    assert config["proxmox"]["password"] == "pass.from.direct.env.specific.for.this.test"
 
 def test_load_config_with_dotenv_override(
     tmp_path: Path, temp_schema_file: Path, monkeypatch: Any
@@ -262,8 +233,7 @@ DOTENV_PROXMOX_HOST="host.from.dotenv"
 ENV_PREFIX_PASSWORD_FROM_DOTENV="password.from.dotenv"
 """
     env_file_path = tmp_path / ".env"
-    with open(env_file_path, "w", encoding="utf-8") as f:
-        f.write(env_content)
+    env_file_path.write_bytes(env_content.encode())
 
     config_data = {
         "proxmox": {
@@ -275,15 +245,9 @@ ENV_PREFIX_PASSWORD_FROM_DOTENV="password.from.dotenv"
     }
     config_path = create_temp_json_file(tmp_path, "config_dotenv.json", config_data)
 
-    original_cwd = Path.cwd()
-    os.chdir(tmp_path) 
-
-    try:
-        config = load_configuration(config_path, temp_schema_file)
-        assert config["proxmox"]["host"] == "host.from.dotenv"
-        assert config["proxmox"]["password"] == "password.from.dotenv"
-    finally:
-        os.chdir(original_cwd)
+    config = load_configuration(config_path, temp_schema_file, dotenv_path=env_file_path)
+    assert config["proxmox"]["host"] == "host.from.dotenv"
+    assert config["proxmox"]["password"] == "password.from.dotenv"
 
 def test_env_prefix_required_field_not_set(
     tmp_path: Path, temp_schema_file: Path, monkeypatch: Any
@@ -301,17 +265,14 @@ def test_env_prefix_required_field_not_set(
     }
     config_path = create_temp_json_file(tmp_path, "config_missing_env.json", config_data_missing_env)
     
-    original_cwd = Path.cwd()
-    os.chdir(tmp_path)
-    try:
-        with pytest.raises(ConfigurationError) as excinfo:
-            load_configuration(config_path, temp_schema_file)
-        assert "Configuration validation error" in str(excinfo.value)
-        assert "is not valid under any of the given schemas" in str(excinfo.value) or \
-               "'password' is a required property" in str(excinfo.value) or \
-               "None is not of type 'string'" in str(excinfo.value) # Added possible error messages
-    finally:
-        os.chdir(original_cwd)
+    with pytest.raises(ConfigurationError, match="Configuration validation error") as excinfo:
+        load_configuration(config_path, temp_schema_file, dotenv_path=tmp_path / ".env")
+    assert re.search(
+        r"is not valid under any of the given schemas"
+        r"|'password' is a required property"
+        r"|None is not of type 'string'",
+        str(excinfo.value),
+    )
 
 def test_load_configuration_raises_oserror_on_config_read_failure(
     tmp_path: Path, temp_schema_file: Path, monkeypatch: Any
@@ -329,11 +290,11 @@ def test_load_configuration_raises_oserror_on_config_read_failure(
 
     monkeypatch.setattr("builtins.open", selective_mock_open)
 
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(
+        ConfigurationError,
+        match="Error reading configuration file.*Simulated OSError during config read",
+    ):
         load_configuration(config_file_to_fail, temp_schema_file)
-    
-    assert "Error reading configuration file" in str(excinfo.value)
-    assert "Simulated OSError during config read" in str(excinfo.value)
 
 def test_load_configuration_raises_oserror_on_schema_read_failure(
     tmp_path: Path, temp_config_file_minimal: Path, monkeypatch: Any
@@ -352,23 +313,21 @@ def test_load_configuration_raises_oserror_on_schema_read_failure(
         return original_open(file_path_arg, *args, **kwargs)
     monkeypatch.setattr("builtins.open", selective_mock_open)
 
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(
+        ConfigurationError,
+        match="Error reading schema file.*Simulated OSError during schema read",
+    ):
         load_configuration(temp_config_file_minimal, schema_file_to_fail)
-    
-    assert "Error reading schema file" in str(excinfo.value)
-    assert "Simulated OSError during schema read" in str(excinfo.value)
 
 def test_load_configuration_invalid_json_in_schema_file(
     tmp_path: Path, temp_config_file_minimal: Path
 ) -> None:
     """Tests ConfigurationError for invalid JSON in the schema file."""
     invalid_schema_path = tmp_path / "invalid_schema.json"
-    with open(invalid_schema_path, "w", encoding="utf-8") as f:
-        f.write("this is not valid json {{{{")
+    invalid_schema_path.write_bytes(INVALID_JSON.encode())
 
-    with pytest.raises(ConfigurationError) as excinfo:
+    with pytest.raises(ConfigurationError, match="Error decoding JSON from schema"):
         load_configuration(temp_config_file_minimal, invalid_schema_path)
-    assert "Error decoding JSON from schema" in str(excinfo.value)
 
 def test_load_configuration_dotenv_from_package_path(
     tmp_path: Path, temp_schema_file: Path, minimal_valid_config_content: Dict[str, Any], monkeypatch: Any
@@ -401,12 +360,20 @@ def test_load_configuration_dotenv_from_package_path(
     mock_config_module_file_path.parent.mkdir(parents=True, exist_ok=True) 
     # Use the aliased module name here
     monkeypatch.setattr(k3s_deploy_cli_config_module, "__file__", str(mock_config_module_file_path))
-    
-    assert not (test_cwd / ".env").exists()
-    assert package_dotenv_file.exists()
 
     # 3. Run and Assert
     loaded_config = load_configuration(config_file, temp_schema_file)
     assert loaded_config["proxmox"]["host"] == "host.from.package.env"
-    
-    monkeypatch.delenv("PACKAGE_VAR_HOST", raising=False)
\ No newline at end of file
+
+def test_schema_validator_is_reused_across_loads(
+    temp_config_file_minimal: Path, temp_schema_file: Path
+) -> None:
+    """Tests that the compiled schema validator is cached between loads."""
+    k3s_deploy_cli_config_module._get_schema_validator.cache_clear()
+
+    load_configuration(temp_config_file_minimal, temp_schema_file)
+    load_configuration(temp_config_file_minimal, temp_schema_file)
+
+    cache_info = k3s_deploy_cli_config_module._get_schema_validator.cache_info()
+    assert cache_info.misses == 1
+    assert cache_info.hits == 1
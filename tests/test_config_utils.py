@@ -6,8 +6,6 @@ VM-specific cloud-init settings, ensuring proper merge behavior and
 edge case handling.
 """
 
-from unittest.mock import MagicMock, patch
-
 import pytest
 
 from k3s_deploy_cli.config_utils import (
@@ -20,6 +18,76 @@ from k3s_deploy_cli.config_utils import (
     merge_cloud_init_config,
 )
 
+# Shared read-only inputs; the functions under test do not mutate their input.
+_NESTED_CONFIG_INPUT = {
+    "users": [
+        {
+            "name": "ubuntu",
+            "groups": [],
+            "ssh_keys": ["ssh-rsa AAAA..."],
+            "metadata": {
+                "tags": [],
+                "description": None,
+                "active": True
+            }
+        }
+    ],
+    "network": {
+        "version": 2,
+        "ethernets": {
+            "eth0": {
+                "dhcp4": True,
+                "routes": []
+            }
+        }
+    }
+}
+
+_NESTED_CONFIG_EXPECTED = {
+    "users": [
+        {
+            "name": "ubuntu",
+            "ssh_keys": ["ssh-rsa AAAA..."],
+            "metadata": {
+                "active": True
+            }
+        }
+    ],
+    "network": {
+        "version": 2,
+        "ethernets": {
+            "eth0": {
+                "dhcp4": True
+            }
+        }
+    }
+}
+
+_VALID_CLOUD_INIT_CONFIG = {
+    "users": [
+        {
+            "name": "ubuntu",
+            "groups": ["sudo"],
+            "shell": "/bin/bash",
+            "sudo": True
+        }
+    ],
+    "packages": ["git", "vim"],
+    "package_update": True,
+    "network": {
+        "version": 2,
+        "ethernets": {
+            "eth0": {"dhcp4": True}
+        }
+    }
+}
+
+
+def _assert_subset(actual, expected):
+    """Assert that every key in ``expected`` is present in ``actual`` with an equal value."""
+    for key, value in expected.items():
+        assert actual[key] == value, f"{key}: {actual[key]!r} != {value!r}"
+
 
 class TestCleanCloudInitConfig:
     """Test cases for clean_cloud_init_config function."""
@@ -74,79 +142,16 @@ class TestCleanCloudInitConfig:
     
     def test_clean_config_nested_cleaning(self):
         """Test that nested structures are cleaned recursively."""
-        config = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "groups": [],
-                    "ssh_keys": ["ssh-rsa AAAA..."],
-                    "metadata": {
-                        "tags": [],
-                        "description": None,
-                        "active": True
-                    }
-                }
-            ],
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {
-                        "dhcp4": True,
-                        "routes": []
-                    }
-                }
-            }
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        expected = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "ssh_keys": ["ssh-rsa AAAA..."],
-                    "metadata": {
-                        "active": True
-                    }
-                }
-            ],
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {
-                        "dhcp4": True
-                    }
-                }
-            }
-        }
-        
-        assert result == expected
+        result = clean_cloud_init_config(_NESTED_CONFIG_INPUT)
+
+        assert result == _NESTED_CONFIG_EXPECTED
     
     def test_clean_config_preserves_valid_data(self):
         """Test that valid data is preserved."""
-        config = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "groups": ["sudo"],
-                    "shell": "/bin/bash",
-                    "sudo": True
-                }
-            ],
-            "packages": ["git", "vim"],
-            "package_update": True,
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {"dhcp4": True}
-                }
-            }
-        }
-        
-        result = clean_cloud_init_config(config)
-        
+        result = clean_cloud_init_config(_VALID_CLOUD_INIT_CONFIG)
+
         # Should be identical since no empty lists or None values
-        assert result == config
+        assert result == _VALID_CLOUD_INIT_CONFIG
     
     def test_clean_config_empty_dict_input(self):
         """Test cleaning empty dictionary."""
@@ -174,8 +179,7 @@ class TestFindNodeByVmid:
         result = find_node_by_vmid(nodes, 101)
         
         assert result is not None
-        assert result['vmid'] == 101
-        assert result['name'] == 'test-vm-2'
+        _assert_subset(result, {'vmid': 101, 'name': 'test-vm-2'})
 
     def test_find_nonexistent_node(self):
         """Test searching for a node that doesn't exist."""
@@ -215,147 +219,90 @@ class TestFindNodeByVmid:
         assert result is None
 
 
-class TestMergeCloudInitConfig:
-    """Test cases for merge_cloud_init_config function."""
-
-    def test_vm_boolean_overrides_global(self):
-        """Test VM boolean setting overrides global boolean."""
-        global_config = {'package_update': True}
-        vm_config = {'package_update': False}
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result['package_update'] is False
-
-    def test_vm_packages_replace_global_packages(self):
-        """Test VM packages completely replace global packages."""
-        global_config = {'packages': ['git', 'curl', 'vim']}
-        vm_config = {'packages': ['docker', 'kubectl']}
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result['packages'] == ['docker', 'kubectl']
-
-    def test_vm_users_replace_global_users(self):
-        """Test VM users completely replace global users."""
-        global_config = {
-            'users': [
-                {'name': 'admin', 'sudo': True},
-                {'name': 'user1', 'sudo': False}
-            ]
-        }
-        vm_config = {
-            'users': [
-                {'name': 'vm-admin', 'sudo': True}
-            ]
-        }
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert len(result['users']) == 1
-        assert result['users'][0]['name'] == 'vm-admin'
-
-    def test_vm_runcmd_replace_global_runcmd(self):
-        """Test VM runcmd completely replaces global runcmd."""
-        global_config = {
-            'runcmd': [
-                'apt update',
-                'apt upgrade -y'
-            ]
-        }
-        vm_config = {
-            'runcmd': [
-                'docker --version'
-            ]
-        }
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result['runcmd'] == ['docker --version']
-
-    def test_missing_vm_config_uses_global(self):
-        """Test missing VM config uses global config as-is."""
-        global_config = {
+# (global_config, vm_config, expected) cases for merge_cloud_init_config
+MERGE_CASES = (
+    pytest.param(
+        {'package_update': True},
+        {'package_update': False},
+        {'package_update': False},
+        id="vm_boolean_overrides_global",
+    ),
+    pytest.param(
+        {'packages': ['git', 'curl', 'vim']},
+        {'packages': ['docker', 'kubectl']},
+        {'packages': ['docker', 'kubectl']},
+        id="vm_packages_replace_global_packages",
+    ),
+    pytest.param(
+        {'users': [{'name': 'admin', 'sudo': True}, {'name': 'user1', 'sudo': False}]},
+        {'users': [{'name': 'vm-admin', 'sudo': True}]},
+        {'users': [{'name': 'vm-admin', 'sudo': True}]},
+        id="vm_users_replace_global_users",
+    ),
+    pytest.param(
+        {'runcmd': ['apt update', 'apt upgrade -y']},
+        {'runcmd': ['docker --version']},
+        {'runcmd': ['docker --version']},
+        id="vm_runcmd_replace_global_runcmd",
+    ),
+    pytest.param(
+        {'packages': ['git', 'curl'], 'package_update': True, 'users': [{'name': 'admin'}]},
+        {},
+        {'packages': ['git', 'curl'], 'package_update': True, 'users': [{'name': 'admin'}]},
+        id="missing_vm_config_uses_global",
+    ),
+    pytest.param(
+        {},
+        {'packages': ['docker'], 'package_upgrade': True},
+        {'packages': ['docker'], 'package_upgrade': True},
+        id="missing_global_config_uses_vm",
+    ),
+    pytest.param({}, {}, {}, id="both_configs_missing_returns_empty"),
+    pytest.param(
+        {
             'packages': ['git', 'curl'],
             'package_update': True,
+            'package_upgrade': False,
             'users': [{'name': 'admin'}]
-        }
-        vm_config = {}
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result == global_config
-
-    def test_missing_global_config_uses_vm(self):
-        """Test missing global config uses VM config as-is."""
-        global_config = {}
-        vm_config = {
+        },
+        # package_update and users not specified, should keep global values
+        {'packages': ['docker'], 'package_upgrade': True},
+        {
             'packages': ['docker'],
-            'package_upgrade': True
-        }
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result == vm_config
-
-    def test_both_configs_missing_returns_empty(self):
-        """Test both configs missing returns empty dict."""
-        global_config = {}
-        vm_config = {}
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result == {}
-
-    def test_partial_vm_override(self):
-        """Test VM config only overrides specified settings."""
-        global_config = {
-            'packages': ['git', 'curl'],
             'package_update': True,
-            'package_upgrade': False,
+            'package_upgrade': True,
             'users': [{'name': 'admin'}]
-        }
-        vm_config = {
-            'packages': ['docker'],
-            'package_upgrade': True
-            # package_update and users not specified, should keep global values
-        }
-        
-        result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result['packages'] == ['docker']
-        assert result['package_update'] is True  # From global
-        assert result['package_upgrade'] is True  # From VM
-        assert result['users'] == [{'name': 'admin'}]  # From global
+        },
+        id="partial_vm_override",
+    ),
+    pytest.param(
+        {'packages': ['git'], 'package_update': True},
+        # None values should not override, other values should
+        {'packages': None, 'package_upgrade': False},
+        {'packages': ['git'], 'package_update': True, 'package_upgrade': False},
+        id="none_values_not_overridden",
+    ),
+)
 
-    def test_none_values_not_overridden(self):
-        """Test VM config with None values don't override global config."""
-        global_config = {
-            'packages': ['git'],
-            'package_update': True
-        }
-        vm_config = {
-            'packages': None,  # Should not override
-            'package_upgrade': False  # Should override
-        }
-        
+
+class TestMergeCloudInitConfig:
+    """Test cases for merge_cloud_init_config function."""
+
+    @pytest.mark.parametrize("global_config, vm_config, expected", MERGE_CASES)
+    def test_merge(self, global_config, vm_config, expected):
+        """Test VM settings replace global settings and everything else is kept."""
         result = merge_cloud_init_config(global_config, vm_config)
-        
-        assert result['packages'] == ['git']  # Global preserved
-        assert result['package_update'] is True  # Global preserved
-        assert result['package_upgrade'] is False  # VM override
+
+        assert result == expected
 
 
 class TestGetMergedCloudInitForVm:
     """Test cases for get_merged_cloud_init_for_vm function."""
 
-    def test_vm_with_overrides(self):
+    def test_vm_with_overrides(self, base_global_cloud_init):
         """Test VM with cloud-init overrides."""
         config = {
-            'cloud_init': {
-                'packages': ['git', 'curl'],
-                'package_update': True
-            },
+            'cloud_init': base_global_cloud_init,
             'nodes': [
                 {
                     'vmid': 100,
@@ -370,17 +317,13 @@ class TestGetMergedCloudInitForVm:
         
         result = get_merged_cloud_init_for_vm(config, 100)
         
-        assert result['packages'] == ['docker']  # VM override
-        assert result['package_update'] is True  # Global preserved
-        assert result['package_upgrade'] is True  # VM addition
+        # packages: VM override, package_update: global preserved, package_upgrade: VM addition
+        _assert_subset(result, {'packages': ['docker'], 'package_update': True, 'package_upgrade': True})
 
-    def test_vm_without_overrides(self):
+    def test_vm_without_overrides(self, base_global_cloud_init):
         """Test VM without cloud-init overrides uses global config."""
         config = {
-            'cloud_init': {
-                'packages': ['git', 'curl'],
-                'package_update': True
-            },
+            'cloud_init': base_global_cloud_init,
             'nodes': [
                 {
                     'vmid': 100,
@@ -392,8 +335,7 @@ class TestGetMergedCloudInitForVm:
         
         result = get_merged_cloud_init_for_vm(config, 100)
         
-        assert result['packages'] == ['git', 'curl']
-        assert result['package_update'] is True
+        _assert_subset(result, {'packages': ['git', 'curl'], 'package_update': True})
 
     def test_vm_not_found_uses_global(self):
         """Test VM not found in nodes uses global config."""
@@ -409,8 +351,7 @@ class TestGetMergedCloudInitForVm:
         
         result = get_merged_cloud_init_for_vm(config, 999)
         
-        assert result['packages'] == ['git']
-        assert result['package_update'] is True
+        _assert_subset(result, {'packages': ['git'], 'package_update': True})
 
     def test_no_global_config_vm_found(self):
         """Test no global config but VM has cloud-init config."""
@@ -429,8 +370,7 @@ class TestGetMergedCloudInitForVm:
         
         result = get_merged_cloud_init_for_vm(config, 100)
         
-        assert result['packages'] == ['docker']
-        assert result['package_upgrade'] is True
+        _assert_subset(result, {'packages': ['docker'], 'package_upgrade': True})
 
     def test_no_global_config_no_vm_config(self):
         """Test no global config and no VM config returns empty."""
@@ -461,8 +401,7 @@ class TestGetMergedCloudInitForVm:
         
         result = get_merged_cloud_init_for_vm(config, 100)
         
-        assert result['packages'] == ['git']
-        assert result['package_update'] is True
+        _assert_subset(result, {'packages': ['git'], 'package_update': True})
 
     def test_empty_nodes_list(self):
         """Test empty nodes list uses global config."""
@@ -477,8 +416,7 @@ class TestGetMergedCloudInitForVm:
         
         assert result['packages'] == ['git']
 
-    @patch('k3s_deploy_cli.config_utils.logger')
-    def test_logging_behavior(self, mock_logger):
+    def test_logging_behavior(self, capture_logs):
         """Test proper logging behavior during merge process."""
         config = {
             'cloud_init': {'packages': ['git']},
@@ -492,162 +430,9 @@ class TestGetMergedCloudInitForVm:
         
         get_merged_cloud_init_for_vm(config, 100)
         
-        # Verify logging calls were made
-        mock_logger.debug.assert_called()
-        mock_logger.info.assert_called()
-
-
-class TestCleanCloudInitConfig:
-    """Test cases for clean_cloud_init_config function."""
-    
-    def test_clean_config_removes_empty_groups(self):
-        """Test that empty groups lists are removed."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        config = {
-            "users": [
-                {"name": "ubuntu", "groups": []},
-                {"name": "admin", "groups": ["wheel", "docker"]}
-            ]
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        # First user should have groups removed, second should keep groups
-        assert result == {
-            "users": [
-                {"name": "ubuntu"},
-                {"name": "admin", "groups": ["wheel", "docker"]}
-            ]
-        }
-    
-    def test_clean_config_removes_none_values(self):
-        """Test that None values are removed."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        config = {
-            "users": [{"name": "ubuntu", "shell": None, "sudo": True}],
-            "packages": None,
-            "network": {"version": 2}
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        assert result == {
-            "users": [{"name": "ubuntu", "sudo": True}],
-            "network": {"version": 2}
-        }
-    
-    def test_clean_config_removes_empty_lists(self):
-        """Test that empty lists are removed."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        config = {
-            "packages": [],
-            "runcmd": ["echo hello"],
-            "users": []
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        assert result == {
-            "runcmd": ["echo hello"]
-        }
-    
-    def test_clean_config_nested_cleaning(self):
-        """Test that nested structures are cleaned recursively."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        config = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "groups": [],
-                    "ssh_keys": ["ssh-rsa AAAA..."],
-                    "metadata": {
-                        "tags": [],
-                        "description": None,
-                        "active": True
-                    }
-                }
-            ],
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {
-                        "dhcp4": True,
-                        "routes": []
-                    }
-                }
-            }
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        expected = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "ssh_keys": ["ssh-rsa AAAA..."],
-                    "metadata": {
-                        "active": True
-                    }
-                }
-            ],
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {
-                        "dhcp4": True
-                    }
-                }
-            }
-        }
-        
-        assert result == expected
-    
-    def test_clean_config_preserves_valid_data(self):
-        """Test that valid data is preserved."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        config = {
-            "users": [
-                {
-                    "name": "ubuntu",
-                    "groups": ["sudo"],
-                    "shell": "/bin/bash",
-                    "sudo": True
-                }
-            ],
-            "packages": ["git", "vim"],
-            "package_update": True,
-            "network": {
-                "version": 2,
-                "ethernets": {
-                    "eth0": {"dhcp4": True}
-                }
-            }
-        }
-        
-        result = clean_cloud_init_config(config)
-        
-        # Should be identical since no empty lists or None values
-        assert result == config
-    
-    def test_clean_config_empty_dict_input(self):
-        """Test cleaning empty dictionary."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        result = clean_cloud_init_config({})
-        assert result == {}
-    
-    def test_clean_config_non_dict_input(self):
-        """Test that non-dict input is returned as-is."""
-        from k3s_deploy_cli.config_utils import clean_cloud_init_config
-        
-        assert clean_cloud_init_config("string") == "string"
-        assert clean_cloud_init_config(123) == 123
-        assert clean_cloud_init_config(["list"]) == ["list"]
+        # Verify debug and info messages were logged
+        assert any("Getting merged cloud-init configuration for VM 100" in log for log in capture_logs.logs)
+        assert any("Merged cloud-init configuration for VM 100:" in log for log in capture_logs.logs)
 
 
 class TestNetworkConfigExtraction:
@@ -655,8 +440,6 @@ class TestNetworkConfigExtraction:
 
     def test_extract_network_config_exists(self):
         """Test extracting network configuration when it exists."""
-        from k3s_deploy_cli.config_utils import extract_network_config
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'packages': ['git'],
@@ -677,8 +460,6 @@ class TestNetworkConfigExtraction:
 
     def test_extract_network_config_missing(self):
         """Test extracting network configuration when it doesn't exist."""
-        from k3s_deploy_cli.config_utils import extract_network_config
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'packages': ['git']
@@ -690,8 +471,6 @@ class TestNetworkConfigExtraction:
 
     def test_extract_network_config_empty(self):
         """Test extracting empty network configuration."""
-        from k3s_deploy_cli.config_utils import extract_network_config
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'network': {}
@@ -703,8 +482,6 @@ class TestNetworkConfigExtraction:
 
     def test_extract_network_config_invalid_type(self):
         """Test extracting network configuration with invalid type."""
-        from k3s_deploy_cli.config_utils import extract_network_config
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'network': "invalid_string"
@@ -716,8 +493,6 @@ class TestNetworkConfigExtraction:
 
     def test_create_network_config_yaml(self):
         """Test creating network configuration YAML."""
-        from k3s_deploy_cli.config_utils import create_network_config_yaml
-        
         network_config = {
             'version': 2,
             'ethernets': {
@@ -736,22 +511,16 @@ class TestNetworkConfigExtraction:
 
     def test_create_network_config_yaml_empty(self):
         """Test creating network configuration YAML with empty config."""
-        from k3s_deploy_cli.config_utils import create_network_config_yaml
-        
         with pytest.raises(ValueError, match="Network configuration cannot be empty"):
             create_network_config_yaml({})
 
     def test_create_network_config_yaml_invalid_type(self):
         """Test creating network configuration YAML with invalid type."""
-        from k3s_deploy_cli.config_utils import create_network_config_yaml
-        
         with pytest.raises(ValueError, match="Network configuration must be a dictionary"):
             create_network_config_yaml("invalid_string")
 
     def test_create_user_config_without_network(self):
         """Test creating user config with network section removed."""
-        from k3s_deploy_cli.config_utils import create_user_config_without_network
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'packages': ['git', 'curl'],
@@ -768,13 +537,10 @@ class TestNetworkConfigExtraction:
         assert 'packages' in result
         assert 'runcmd' in result
         assert 'network' not in result
-        assert result['users'] == [{'name': 'ubuntu'}]
-        assert result['packages'] == ['git', 'curl']
+        _assert_subset(result, {'users': [{'name': 'ubuntu'}], 'packages': ['git', 'curl']})
 
     def test_create_user_config_without_network_no_network_section(self):
         """Test creating user config when no network section exists."""
-        from k3s_deploy_cli.config_utils import create_user_config_without_network
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'packages': ['git']
@@ -787,11 +553,8 @@ class TestNetworkConfigExtraction:
         assert 'packages' in result
         assert 'network' not in result
 
-    @patch('k3s_deploy_cli.config_utils.logger')
-    def test_extract_network_config_logging(self, mock_logger):
+    def test_extract_network_config_logging(self, capture_logs):
         """Test that network config extraction includes proper logging."""
-        from k3s_deploy_cli.config_utils import extract_network_config
-        
         cloud_init_config = {
             'network': {'version': 2, 'ethernets': {'eth0': {'dhcp4': True}}}
         }
@@ -799,13 +562,10 @@ class TestNetworkConfigExtraction:
         extract_network_config(cloud_init_config)
         
         # Verify logging calls were made
-        mock_logger.debug.assert_called()
+        assert any("Found network configuration with keys" in log for log in capture_logs.logs)
 
-    @patch('k3s_deploy_cli.config_utils.logger')
-    def test_create_user_config_without_network_logging(self, mock_logger):
+    def test_create_user_config_without_network_logging(self, capture_logs):
         """Test that user config creation includes proper logging."""
-        from k3s_deploy_cli.config_utils import create_user_config_without_network
-        
         cloud_init_config = {
             'users': [{'name': 'ubuntu'}],
             'network': {'version': 2}
@@ -814,4 +574,4 @@ class TestNetworkConfigExtraction:
         create_user_config_without_network(cloud_init_config)
         
         # Verify logging calls were made
-        mock_logger.debug.assert_called()
+        assert any("Removed network section from user configuration" in log for log in capture_logs.logs)
@@ -0,0 +1,12 @@
+# file: tests/test_conftest.py
+"""Unit tests for the shared fixtures in conftest.py."""
+
+import pytest
+from rich.console import Console
+
+
+def test_mock_console_keeps_console_spec(mock_console):
+    """Test the shared console mock still rejects attributes Console lacks."""
+    assert isinstance(mock_console, Console)
+    with pytest.raises(AttributeError):
+        mock_console.not_a_console_method
@@ -1,166 +1,271 @@
 # file: tests/test_discover_command.py
-"""Unit tests for the discover command implementation."""
+"""Unit tests for the discover command implementation.
 
+TestHandleDiscoverCommand patches the API client and node discovery once per
+class and resets those mocks before every test; all other patching is scoped to
+individual tests (monkeypatch or fixtures). Nothing is shared across modules, so
+the file can be spread across pytest-xdist workers.
+"""
+
+import builtins
+import io
 import json
+from collections import Counter
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, mock_open, patch
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+from unittest.mock import MagicMock, patch
 
 import pytest
 from rich.console import Console
+from rich.table import Table
 
+from k3s_deploy_cli.commands import discover_command
 from k3s_deploy_cli.commands.discover_command import (
     _handle_json_output,
+    _to_config_node,
     _handle_table_output,
     _update_config_file_with_nodes,
     handle_discover_command,
 )
 from k3s_deploy_cli.exceptions import ConfigurationError, ProxmoxInteractionError
+from tests.fixtures.mock_data import INVALID_JSON
+
+
+_VALID_CONFIG_JSON = '{"proxmox": {"host": "test.com"}}'
+
+
+def _frozen_nodes(*nodes):
+    """Returns discovered-node payloads as an immutable tuple of read-only mappings."""
+    return tuple(MappingProxyType(node) for node in nodes)
+
+
+@pytest.fixture(scope="session")
+def small_cluster_nodes():
+    """Provides a running one-server, one-agent cluster."""
+    return _frozen_nodes(
+        {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
+        {'vmid': 101, 'name': 'k3s-agent-1', 'role': 'agent', 'node': 'node2', 'status': 'running'},
+    )
+
+
+@pytest.fixture(scope="session")
+def small_cluster_json():
+    """Provides the config JSON printed for small_cluster_nodes, serialised once."""
+    return json.dumps([{'vmid': 100, 'role': 'server'}, {'vmid': 101, 'role': 'agent'}], indent=2)
+
+
+@pytest.fixture(scope="session")
+def large_cluster_nodes():
+    """Provides a larger cluster mixing server, agent and storage roles."""
+    return _frozen_nodes(
+        {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
+        {'vmid': 101, 'name': 'k3s-server-2', 'role': 'server', 'node': 'node2', 'status': 'running'},
+        {'vmid': 110, 'name': 'k3s-agent-1', 'role': 'agent', 'node': 'node3', 'status': 'running'},
+        {'vmid': 111, 'name': 'k3s-agent-2', 'role': 'agent', 'node': 'node4', 'status': 'stopped'},
+        {'vmid': 120, 'name': 'k3s-storage-1', 'role': 'storage', 'node': 'node1', 'status': 'running'},
+    )
+
+
+@pytest.fixture(scope="session")
+def single_server_node():
+    """Provides a single server node carrying an IP configuration."""
+    return _frozen_nodes({
+        'vmid': 100,
+        'name': 'k3s-server-1',
+        'role': 'server',
+        'ip_config': {'address': '192.168.1.100/24', 'gateway': '192.168.1.1'},
+    })
+
+
+@pytest.fixture(scope="session")
+def json_file_node():
+    """Provides a minimal node used for JSON-to-file output."""
+    return _frozen_nodes({'vmid': 100, 'name': 'test-vm', 'role': 'server'})
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """Runs the test from a temporary directory holding a minimal valid config.json."""
+    (tmp_path / 'config.json').write_text(_VALID_CONFIG_JSON)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _read_json(path):
+    return json.loads(path.read_text())
+
+
+def _fail_writes(monkeypatch, failing_writes):
+    """Makes open() raise the mapped exception when one of the given paths is opened for writing."""
+    real_open = builtins.open
+
+    def opener(file, mode='r', *args, **kwargs):
+        if 'w' in mode and str(file) in failing_writes:
+            raise failing_writes[str(file)]
+        return real_open(file, mode, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', opener)
+
+
+@pytest.fixture
+def patched_api_client(monkeypatch):
+    """Replaces get_proxmox_api_client in the discover command module."""
+    mock_get_api_client = MagicMock()
+    monkeypatch.setattr(discover_command, 'get_proxmox_api_client', mock_get_api_client)
+    return mock_get_api_client
+
+
+@pytest.fixture
+def patched_discover_nodes(monkeypatch):
+    """Replaces discover_k3s_nodes in the discover command module."""
+    mock_discover_nodes = MagicMock()
+    monkeypatch.setattr(discover_command, 'discover_k3s_nodes', mock_discover_nodes)
+    return mock_discover_nodes
 
 
 class TestHandleDiscoverCommand:
     """Tests for the main handle_discover_command function."""
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    @patch('k3s_deploy_cli.commands.discover_command._handle_table_output')
-    def test_handle_discover_command_table_output_happy_path(self, mock_handle_table, 
-                                                           mock_discover_nodes, mock_get_api_client,
-                                                           basic_proxmox_config, mock_console, mock_proxmox_client):
+    @pytest.fixture(autouse=True, scope="class")
+    @classmethod
+    def _patched_discovery(cls):
+        """Patches the API client and node discovery once for the whole class."""
+        with patch.object(discover_command, 'get_proxmox_api_client') as mock_get_api_client, \
+             patch.object(discover_command, 'discover_k3s_nodes') as mock_discover_nodes:
+            yield mock_get_api_client, mock_discover_nodes
+
+    @pytest.fixture(autouse=True)
+    def discovery_mocks(self, _patched_discovery):
+        """Returns the class-wide mocks with calls, return values and side effects cleared."""
+        for mock in _patched_discovery:
+            mock.reset_mock(return_value=True, side_effect=True)
+        return _patched_discovery
+
+    def test_handle_discover_command_table_output_happy_path(self, discovery_mocks, basic_proxmox_config,
+                                                             recording_console, mock_proxmox_client,
+                                                             small_cluster_nodes, monkeypatch):
         """Test successful discover command with table output."""
         # Arrange - Use shared fixtures
+        mock_get_api_client, mock_discover_nodes = discovery_mocks
+        mock_handle_table = MagicMock()
+        monkeypatch.setattr(discover_command, '_handle_table_output', mock_handle_table)
         mock_get_api_client.return_value = mock_proxmox_client
-        
-        mock_discovered_nodes = [
-            {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
-            {'vmid': 101, 'name': 'k3s-agent-1', 'role': 'agent', 'node': 'node2', 'status': 'running'}
-        ]
-        mock_discover_nodes.return_value = mock_discovered_nodes
+        mock_discover_nodes.return_value = small_cluster_nodes
 
         # Act
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="table", output_target="stdout")
+        handle_discover_command(basic_proxmox_config, recording_console, output_format="table", output_target="stdout")
 
         # Assert
         mock_get_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
         mock_discover_nodes.assert_called_once_with(mock_proxmox_client)
-        mock_handle_table.assert_called_once_with(mock_discovered_nodes, mock_console, "stdout")
-
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    @patch('k3s_deploy_cli.commands.discover_command._handle_json_output')
-    def test_handle_discover_command_json_output_happy_path(self, mock_handle_json,
-                                                          mock_discover_nodes, mock_get_api_client,
-                                                          basic_proxmox_config, mock_console, mock_proxmox_client):
+        mock_handle_table.assert_called_once_with(small_cluster_nodes, recording_console, "stdout")
+
+    def test_handle_discover_command_json_output_happy_path(self, discovery_mocks, basic_proxmox_config,
+                                                            recording_console, monkeypatch):
         """Test successful discover command with JSON output."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
+        _, mock_discover_nodes = discovery_mocks
+        mock_handle_json = MagicMock()
+        monkeypatch.setattr(discover_command, '_handle_json_output', mock_handle_json)
         mock_discovered_nodes = [{'vmid': 100, 'name': 'test-vm'}]
         mock_discover_nodes.return_value = mock_discovered_nodes
 
         # Act
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="json", output_target="file")
+        handle_discover_command(basic_proxmox_config, recording_console, output_format="json", output_target="file")
 
         # Assert
-        mock_handle_json.assert_called_once_with(mock_discovered_nodes, mock_console, "file")
+        mock_handle_json.assert_called_once_with(mock_discovered_nodes, recording_console, "file")
 
-    def test_handle_discover_command_missing_proxmox_config(self, mock_console):
+    def test_handle_discover_command_missing_proxmox_config(self, discovery_mocks, recording_console):
         """Test discover command with missing Proxmox configuration."""
         # Arrange - Use shared fixtures
+        mock_get_api_client, _ = discovery_mocks
         config = {}  # Missing proxmox section
 
         # Act & Assert
         with pytest.raises(ConfigurationError) as exc_info:
-            handle_discover_command(config, mock_console)
+            handle_discover_command(config, recording_console)
         
         assert "Proxmox configuration is missing" in str(exc_info.value)
+        mock_get_api_client.assert_not_called()
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    def test_handle_discover_command_proxmox_connection_failure(self, mock_get_api_client, basic_proxmox_config, mock_console):
+    def test_handle_discover_command_proxmox_connection_failure(self, discovery_mocks, basic_proxmox_config,
+                                                                recording_console):
         """Test discover command with Proxmox connection failure."""
         # Arrange - Use shared fixtures
+        mock_get_api_client, _ = discovery_mocks
         mock_get_api_client.side_effect = ProxmoxInteractionError("Connection failed")
 
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
-            handle_discover_command(basic_proxmox_config, mock_console)
+            handle_discover_command(basic_proxmox_config, recording_console)
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_handle_discover_command_no_nodes_found(self, mock_discover_nodes, mock_get_api_client, 
-                                                   basic_proxmox_config, mock_console, mock_proxmox_client):
+    def test_handle_discover_command_no_nodes_found(self, discovery_mocks, basic_proxmox_config, recording_console):
         """Test discover command when no K3s nodes are found."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
+        _, mock_discover_nodes = discovery_mocks
         mock_discover_nodes.return_value = []  # No nodes found
 
         # Act
-        handle_discover_command(basic_proxmox_config, mock_console)
+        handle_discover_command(basic_proxmox_config, recording_console)
 
         # Assert
-        mock_console.print.assert_called()  # Should print "no VMs found" message
+        assert recording_console.n > 0  # Should print "no VMs found" message
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_handle_discover_command_api_error_during_discovery(self, mock_discover_nodes, mock_get_api_client,
-                                                              basic_proxmox_config, mock_console, mock_proxmox_client):
+    def test_handle_discover_command_api_error_during_discovery(self, discovery_mocks, basic_proxmox_config,
+                                                                recording_console):
         """Test discover command with API error during node discovery."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
+        _, mock_discover_nodes = discovery_mocks
         mock_discover_nodes.side_effect = ProxmoxInteractionError("API error during discovery")
 
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
-            handle_discover_command(basic_proxmox_config, mock_console)
+            handle_discover_command(basic_proxmox_config, recording_console)
 
 
 class TestHandleJsonOutput:
     """Tests for the _handle_json_output function."""
 
-    def test_handle_json_output_stdout(self, mock_console):
+    def test_handle_json_output_stdout(self, recording_console, small_cluster_nodes, small_cluster_json):
         """Test JSON output to stdout."""
-        # Arrange - Use shared fixtures
-        discovered_nodes = [
-            {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server'},
-            {'vmid': 101, 'name': 'k3s-agent-1', 'role': 'agent'}
-        ]
-
         # Act
-        _handle_json_output(discovered_nodes, mock_console, "stdout")
+        _handle_json_output(small_cluster_nodes, recording_console, "stdout")
 
-        # Assert
-        mock_console.print.assert_called()
-        # Verify JSON content was printed (check call arguments)
-        print_calls = mock_console.print.call_args_list
-        assert len(print_calls) > 0
+        # Assert - Only vmid and role are emitted, in discovery order
+        assert ((small_cluster_json,), {}) in recording_console.calls
 
-    @patch('k3s_deploy_cli.commands.discover_command._update_config_file_with_nodes')
-    def test_handle_json_output_file(self, mock_update_config, mock_console):
+    @patch.object(discover_command, '_update_config_file_with_nodes')
+    def test_handle_json_output_file(self, mock_update_config, recording_console, json_file_node):
         """Test JSON output to file."""
-        # Arrange - Use shared fixtures
-        discovered_nodes = [{'vmid': 100, 'name': 'test-vm', 'role': 'server'}]
-
         # Act
-        _handle_json_output(discovered_nodes, mock_console, "file")
+        _handle_json_output(json_file_node, recording_console, "file")
 
         # Assert
         expected_config_nodes = [{'vmid': 100, 'role': 'server'}]
-        mock_update_config.assert_called_once_with(expected_config_nodes, mock_console)
+        mock_update_config.assert_called_once_with(expected_config_nodes, recording_console)
 
-    def test_handle_json_output_empty_nodes(self, mock_console):
+    def test_to_config_node_keeps_only_config_fields(self, single_server_node):
+        """Test discovered nodes are projected onto vmid and role only."""
+        assert _to_config_node(single_server_node[0]) == {'vmid': 100, 'role': 'server'}
+
+    def test_handle_json_output_empty_nodes(self, recording_console):
         """Test JSON output with empty nodes list."""
         # Arrange - Use shared fixtures
         discovered_nodes = []
 
         # Act
-        _handle_json_output(discovered_nodes, mock_console, "stdout")
+        _handle_json_output(discovered_nodes, recording_console, "stdout")
 
         # Assert
-        mock_console.print.assert_called()
+        assert recording_console.n > 0
 
 
 class TestHandleTableOutput:
     """Tests for the _handle_table_output function."""
 
-    def test_handle_table_output_with_nodes(self, mock_console):
+    def test_handle_table_output_with_nodes(self, recording_console):
         """Test table output with discovered nodes."""
         # Arrange - Use shared fixtures
         discovered_nodes = [
@@ -169,40 +274,50 @@ class TestHandleTableOutput:
         ]
 
         # Act
-        _handle_table_output(discovered_nodes, mock_console, "stdout")
+        _handle_table_output(discovered_nodes, recording_console, "stdout")
 
-        # Assert
-        assert mock_console.print.call_count >= 3  # Table + 2 info messages
+        # Assert - One table, framed by a heading and two usage hints
+        printed = Counter(type(args[0]).__name__ for args, _ in recording_console.calls)
+        assert printed == {'Table': 1, 'Text': 3}
+        table = next(args[0] for args, _ in recording_console.calls if isinstance(args[0], Table))
+        assert table.row_count == len(discovered_nodes)
 
-    def test_handle_table_output_empty_nodes(self, mock_console):
+    def test_handle_table_output_empty_nodes(self, recording_console):
         """Test table output with empty nodes list."""
         # Arrange - Use shared fixtures
         discovered_nodes = []
 
         # Act
-        _handle_table_output(discovered_nodes, mock_console, "stdout")
+        _handle_table_output(discovered_nodes, recording_console, "stdout")
 
         # Assert
-        mock_console.print.assert_called()  # Should still print empty table
+        assert recording_console.n > 0  # Should still print empty table
 
-    def test_handle_table_output_different_target(self, mock_console):
+    def test_handle_table_output_different_target(self, recording_console):
         """Test table output with file target raises error."""
         # Arrange - Use shared fixtures
         discovered_nodes = [{'vmid': 100, 'name': 'test-vm', 'role': 'server', 'node': 'node1', 'status': 'running'}]
 
         # Act & Assert
         with pytest.raises(ConfigurationError) as exc_info:
-            _handle_table_output(discovered_nodes, mock_console, "file")
+            _handle_table_output(discovered_nodes, recording_console, "file")
         
         assert "File output requires JSON format" in str(exc_info.value)
 
 
+# (existing config text, path whose write fails, expected error text)
+UPDATE_FAILURE_CASES = (
+    pytest.param(INVALID_JSON, {}, "Expecting value", id="invalid-json"),
+    pytest.param(_VALID_CONFIG_JSON, {'config.json.backup': OSError("Permission denied")}, "Permission denied",
+                 id="backup-write-fails"),
+    pytest.param(_VALID_CONFIG_JSON, {'config.json': OSError("Disk full")}, "Disk full", id="final-write-fails"),
+)
+
+
 class TestUpdateConfigFileWithNodes:
     """Tests for the _update_config_file_with_nodes function."""
 
-    @patch('builtins.open', new_callable=mock_open, read_data='{"proxmox": {"host": "test.com"}}')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_with_nodes_successful(self, mock_exists, mock_file, mock_console):
+    def test_update_config_file_with_nodes_successful(self, recording_console, config_dir):
         """Test successful config file update with discovered nodes."""
         # Arrange - Use shared fixtures
         discovered_nodes = [
@@ -213,276 +328,182 @@ class TestUpdateConfigFileWithNodes:
                 'ip_config': {'address': '192.168.1.100/24', 'gateway': '192.168.1.1'}
             }
         ]
-        mock_exists.return_value = True
 
         # Act
-        _update_config_file_with_nodes(discovered_nodes, mock_console)
+        _update_config_file_with_nodes(discovered_nodes, recording_console)
 
-        # Assert
-        assert mock_file.call_count >= 3  # Read original, write backup, write updated
-        mock_console.print.assert_called()  # Success message displayed
+        # Assert - Backup holds the original config, config.json gains the nodes
+        assert _read_json(config_dir / 'config.json.backup') == json.loads(_VALID_CONFIG_JSON)
+        assert _read_json(config_dir / 'config.json') == {
+            'proxmox': {'host': 'test.com'},
+            'nodes': discovered_nodes,
+        }
+        assert recording_console.n > 0  # Success message displayed
 
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_missing_config(self, mock_exists, mock_file, mock_console):
+    def test_update_config_file_missing_config(self, recording_console, config_dir):
         """Test config file update when config.json doesn't exist."""
         # Arrange - Use shared fixtures
+        (config_dir / 'config.json').unlink()
         discovered_nodes = [{'vmid': 100, 'name': 'test-vm'}]
-        mock_exists.return_value = False
 
         # Act
-        _update_config_file_with_nodes(discovered_nodes, mock_console)
+        _update_config_file_with_nodes(discovered_nodes, recording_console)
 
-        # Assert
-        mock_console.print.assert_called()  # Should display error message
-
-    @patch('builtins.open', new_callable=mock_open, read_data='invalid json')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_invalid_json(self, mock_exists, mock_file, mock_console):
-        """Test config file update with invalid JSON in existing file."""
-        # Arrange - Use shared fixtures
-        discovered_nodes = [{'vmid': 100, 'name': 'test-vm'}]
-        mock_exists.return_value = True
-
-        # Act & Assert
-        with pytest.raises(ConfigurationError) as exc_info:
-            _update_config_file_with_nodes(discovered_nodes, mock_console)
-        
-        assert "Failed to update config.json" in str(exc_info.value)
-
-    @patch('builtins.open', new_callable=mock_open)
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_backup_failure(self, mock_exists, mock_file, mock_console):
-        """Test config file update when backup creation fails."""
-        # Arrange - Use shared fixtures
-        discovered_nodes = [{'vmid': 100, 'name': 'test-vm'}]
-        mock_exists.return_value = True
-        
-        # Make backup write operation fail
-        mock_file.side_effect = [
-            mock_open(read_data='{"proxmox": {"host": "test.com"}}').return_value,  # Read config
-            OSError("Permission denied")  # Backup write fails
-        ]
-
-        # Act & Assert
-        with pytest.raises(ConfigurationError) as exc_info:
-            _update_config_file_with_nodes(discovered_nodes, mock_console)
-        
-        assert "Failed to update config.json" in str(exc_info.value)
+        # Assert - A new config is written without a backup
+        assert _read_json(config_dir / 'config.json') == {'nodes': discovered_nodes}
+        assert not (config_dir / 'config.json.backup').exists()
+        assert recording_console.n > 0
 
-    @patch('builtins.open', new_callable=mock_open, read_data='{"proxmox": {"host": "test.com"}}')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_write_failure(self, mock_exists, mock_file, mock_console):
-        """Test config file update when writing fails."""
-        # Arrange - Use shared fixtures
+    @pytest.mark.parametrize("config_text,failing_writes,expected", UPDATE_FAILURE_CASES)
+    def test_update_config_file_failure(self, config_text, failing_writes, expected, recording_console, config_dir,
+                                        monkeypatch):
+        """Test config file update failures are reported as ConfigurationError."""
+        # Arrange
+        (config_dir / 'config.json').write_text(config_text)
+        _fail_writes(monkeypatch, failing_writes)
         discovered_nodes = [{'vmid': 100, 'name': 'test-vm'}]
-        mock_exists.return_value = True
-        
-        # Make final write operation fail (after successful read and backup)
-        mock_file.side_effect = [
-            mock_open(read_data='{"proxmox": {"host": "test.com"}}').return_value,  # Read config
-            mock_open().return_value,  # Write backup (succeeds)
-            OSError("Disk full")  # Final write fails
-        ]
 
         # Act & Assert
-        with pytest.raises(ConfigurationError) as exc_info:
-            _update_config_file_with_nodes(discovered_nodes, mock_console)
-        
-        assert "Failed to update config.json" in str(exc_info.value)
+        with pytest.raises(ConfigurationError, match=f"Failed to update config.json: .*{expected}"):
+            _update_config_file_with_nodes(discovered_nodes, recording_console)
 
-    @patch('builtins.open', new_callable=mock_open, read_data='{"proxmox": {"host": "test.com"}, "nodes": [{"vmid": 999}]}')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_overwrites_existing_nodes(self, mock_exists, mock_file, mock_console):
+    def test_update_config_file_overwrites_existing_nodes(self, recording_console, config_dir):
         """Test that config file update overwrites existing nodes section."""
         # Arrange - Use shared fixtures
+        (config_dir / 'config.json').write_text('{"proxmox": {"host": "test.com"}, "nodes": [{"vmid": 999}]}')
         discovered_nodes = [{'vmid': 100, 'name': 'new-vm'}]
-        mock_exists.return_value = True
 
         # Act
-        _update_config_file_with_nodes(discovered_nodes, mock_console)
+        _update_config_file_with_nodes(discovered_nodes, recording_console)
 
         # Assert
-        assert mock_file.call_count >= 3  # Read, backup write, updated write
-        mock_console.print.assert_called()  # Success message displayed
+        assert _read_json(config_dir / 'config.json')['nodes'] == discovered_nodes
+        assert _read_json(config_dir / 'config.json.backup')['nodes'] == [{'vmid': 999}]
+        assert recording_console.n > 0  # Success message displayed
 
-    @patch('builtins.open', new_callable=mock_open, read_data='{"proxmox": {"host": "test.com"}}')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_update_config_file_empty_nodes_list(self, mock_exists, mock_file, mock_console):
+    def test_update_config_file_empty_nodes_list(self, recording_console, config_dir):
         """Test config file update with empty nodes list."""
-        # Arrange - Use shared fixtures
-        discovered_nodes = []
-        mock_exists.return_value = True
-        
-        # Set up mock_open to handle both read and write operations
-        mock_file.return_value.__enter__.return_value.read.return_value = '{"proxmox": {"host": "test.com"}}'
-
         # Act
-        _update_config_file_with_nodes(discovered_nodes, mock_console)
+        _update_config_file_with_nodes([], recording_console)
+
+        # Assert - The update is still written, with an empty nodes array
+        assert _read_json(config_dir / 'config.json')['nodes'] == []
+        assert recording_console.n > 0
+
+
+class DiscoverScenario(NamedTuple):
+    """One end-to-end discover run; `nodes` names the session fixture returned by discovery."""
+
+    nodes: str = "small_cluster_nodes"
+    output_format: str = "table"
+    output_target: str = "stdout"
+    client_error: Optional[Exception] = None
+    discovery_error: Optional[Exception] = None
 
-        # Assert
-        mock_console.print.assert_called()  # Should still attempt update
-        # Verify that file operations were attempted (read original, write backup, write updated)
-        assert mock_file.call_count >= 2  # At least backup and updated config writes
+
+DISCOVER_SCENARIOS = (
+    pytest.param(DiscoverScenario(), id="table-small-cluster"),
+    pytest.param(DiscoverScenario(nodes="large_cluster_nodes"), id="table-large-cluster"),
+    pytest.param(DiscoverScenario(output_format="json"), id="json-stdout"),
+    pytest.param(DiscoverScenario(discovery_error=ProxmoxInteractionError("Connection timeout")),
+                 id="network-timeout"),
+    pytest.param(DiscoverScenario(client_error=ProxmoxInteractionError("Authentication failed")),
+                 id="authentication-failure"),
+)
 
 
 class TestDiscoverCommandIntegration:
     """Integration-style tests for the discover command."""
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_discover_command_full_flow_table_format(self, mock_discover_nodes, mock_get_api_client, 
-                                                    basic_proxmox_config, mock_console, mock_proxmox_client):
-        """Test complete discover command flow with table format."""
-        # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_discovered_nodes = [
-            {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
-            {'vmid': 101, 'name': 'k3s-agent-1', 'role': 'agent', 'node': 'node2', 'status': 'running'}
-        ]
-        mock_discover_nodes.return_value = mock_discovered_nodes
-
-        # Act
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="table", output_target="stdout")
+    @pytest.mark.parametrize("scenario", DISCOVER_SCENARIOS)
+    def test_discover_command_scenario(self, scenario, request, basic_proxmox_config, recording_console,
+                                       patched_api_client, patched_discover_nodes):
+        """Test the discover flow end to end for each scenario in DISCOVER_SCENARIOS."""
+        # Arrange
+        patched_api_client.side_effect = scenario.client_error
+        patched_discover_nodes.return_value = request.getfixturevalue(scenario.nodes)
+        patched_discover_nodes.side_effect = scenario.discovery_error
+        error = scenario.client_error or scenario.discovery_error
 
-        # Assert
-        mock_get_api_client.assert_called_once()
-        mock_discover_nodes.assert_called_once()
-        assert mock_console.print.call_count > 0  # Table and info messages displayed
-
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    @patch('builtins.open', new_callable=mock_open, read_data='{"proxmox": {"host": "test.com"}}')
-    @patch('k3s_deploy_cli.commands.discover_command.Path.exists')
-    def test_discover_command_full_flow_json_to_file(self, mock_exists, mock_file,
-                                                   mock_discover_nodes, mock_get_api_client,
-                                                   basic_proxmox_config, mock_console, mock_proxmox_client):
+        # Act & Assert
+        if error is None:
+            handle_discover_command(basic_proxmox_config, recording_console,
+                                    output_format=scenario.output_format, output_target=scenario.output_target)
+            assert recording_console.n > 0  # Table and info messages displayed
+        else:
+            with pytest.raises(type(error), match=str(error)):
+                handle_discover_command(basic_proxmox_config, recording_console,
+                                        output_format=scenario.output_format, output_target=scenario.output_target)
+
+        patched_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
+        if scenario.client_error is None:
+            patched_discover_nodes.assert_called_once_with(patched_api_client.return_value)
+        else:
+            patched_discover_nodes.assert_not_called()
+
+    def test_discover_command_full_flow_json_to_file(self, basic_proxmox_config, recording_console, mock_proxmox_client,
+                                                     single_server_node, config_dir, patched_api_client,
+                                                     patched_discover_nodes):
         """Test complete discover command flow with JSON output to file."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_discovered_nodes = [
-            {
-                'vmid': 100,
-                'name': 'k3s-server-1',
-                'role': 'server',
-                'ip_config': {'address': '192.168.1.100/24', 'gateway': '192.168.1.1'}
-            }
-        ]
-        mock_discover_nodes.return_value = mock_discovered_nodes
-        mock_exists.return_value = True
+        patched_api_client.return_value = mock_proxmox_client
+        patched_discover_nodes.return_value = single_server_node
 
         # Act
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="json", output_target="file")
+        handle_discover_command(basic_proxmox_config, recording_console, output_format="json", output_target="file")
 
         # Assert
-        mock_get_api_client.assert_called_once()
-        mock_discover_nodes.assert_called_once()
-        assert mock_file.call_count >= 3  # Read, backup write, updated write
-        mock_console.print.assert_called()  # Success message displayed
-
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_discover_command_realistic_large_cluster(self, mock_discover_nodes, mock_get_api_client,
-                                                     basic_proxmox_config, mock_console, mock_proxmox_client):
-        """Test discover command with realistic large cluster scenario."""
-        # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        # Simulate larger cluster with multiple node types
-        mock_discovered_nodes = [
-            {'vmid': 100, 'name': 'k3s-server-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
-            {'vmid': 101, 'name': 'k3s-server-2', 'role': 'server', 'node': 'node2', 'status': 'running'},
-            {'vmid': 110, 'name': 'k3s-agent-1', 'role': 'agent', 'node': 'node3', 'status': 'running'},
-            {'vmid': 111, 'name': 'k3s-agent-2', 'role': 'agent', 'node': 'node4', 'status': 'stopped'},
-            {'vmid': 120, 'name': 'k3s-storage-1', 'role': 'storage', 'node': 'node1', 'status': 'running'}
-        ]
-        mock_discover_nodes.return_value = mock_discovered_nodes
+        patched_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
+        patched_discover_nodes.assert_called_once_with(mock_proxmox_client)
+        assert _read_json(config_dir / 'config.json')['nodes'] == [{'vmid': 100, 'role': 'server'}]
+        assert (config_dir / 'config.json.backup').exists()
+        assert recording_console.n > 0  # Success message displayed
+
+    @pytest.mark.parametrize("output_format,output_target", [
+        ("table", "stdout"),
+        ("table", "file"),
+        ("json", "stdout"),
+        ("json", "file"),
+    ])
+    def test_discover_command_parameter_validation(self, output_format, output_target, basic_proxmox_config,
+                                                   recording_console, patched_api_client, patched_discover_nodes):
+        """Test discover command accepts every valid parameter combination."""
+        # Arrange
+        patched_discover_nodes.return_value = []
 
-        # Act
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="table", output_target="stdout")
+        # Act - Should not raise any exceptions
+        handle_discover_command(basic_proxmox_config, recording_console, output_format, output_target)
 
         # Assert
-        mock_get_api_client.assert_called_once()
-        mock_discover_nodes.assert_called_once()
-        assert mock_console.print.call_count > 0
-
-    def test_discover_command_parameter_validation(self, basic_proxmox_config, mock_console):
-        """Test discover command parameter validation."""
-        # Arrange - Use shared fixtures
-        # Test valid parameter combinations
-        valid_combinations = [
-            ("table", "stdout"),
-            ("table", "file"),
-            ("json", "stdout"),
-            ("json", "file")
-        ]
-
-        for output_format, output_target in valid_combinations:
-            with patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client') as mock_client:
-                with patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes') as mock_discover:
-                    mock_client.return_value = MagicMock()
-                    mock_discover.return_value = []
-                    
-                    # Should not raise any exceptions
-                    handle_discover_command(basic_proxmox_config, mock_console, output_format, output_target)
+        patched_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
+        patched_discover_nodes.assert_called_once_with(patched_api_client.return_value)
 
 
 class TestDiscoverCommandErrorScenarios:
     """Tests for error scenarios and edge cases in discover command."""
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_discover_command_network_timeout(self, mock_discover_nodes, mock_get_api_client,
-                                             basic_proxmox_config, mock_console, mock_proxmox_client):
-        """Test discover command with network timeout."""
-        # Arrange
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_discover_nodes.side_effect = ProxmoxInteractionError("Connection timeout")
-
-        # Act & Assert
-        with pytest.raises(ProxmoxInteractionError) as exc_info:
-            handle_discover_command(basic_proxmox_config, mock_console)
-        
-        assert "Connection timeout" in str(exc_info.value)
-
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    def test_discover_command_authentication_failure(self, mock_get_api_client, 
-                                                    basic_proxmox_config, mock_console):
-        """Test discover command with authentication failure."""
-        # Arrange
-        mock_get_api_client.side_effect = ProxmoxInteractionError("Authentication failed")
-
-        # Act & Assert
-        with pytest.raises(ProxmoxInteractionError) as exc_info:
-            handle_discover_command(basic_proxmox_config, mock_console)
-        
-        assert "Authentication failed" in str(exc_info.value)
-
-    def test_discover_command_malformed_config(self, mock_console):
+    def test_discover_command_malformed_config(self, recording_console):
         """Test discover command with malformed Proxmox configuration."""
         # Arrange
         config = {'proxmox': {}}  # Missing required fields
 
         # Act & Assert
         with pytest.raises(ConfigurationError):
-            handle_discover_command(config, mock_console)
+            handle_discover_command(config, recording_console)
 
-    @patch('k3s_deploy_cli.commands.discover_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.discover_command.discover_k3s_nodes')
-    def test_discover_command_unicode_vm_names(self, mock_discover_nodes, mock_get_api_client,
-                                             basic_proxmox_config, mock_console, mock_proxmox_client):
-        """Test discover command with Unicode characters in VM names."""
-        # Arrange
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_discovered_nodes = [
+    def test_discover_command_unicode_vm_names(self):
+        """Test Unicode VM names are rendered intact in the discover table."""
+        # Arrange - A real Console writing to memory, so the table is actually rendered
+        console = Console(file=io.StringIO(), width=160, color_system=None)
+        discovered_nodes = [
             {'vmid': 100, 'name': 'k3s-服务器-1', 'role': 'server', 'node': 'node1', 'status': 'running'},
             {'vmid': 101, 'name': 'k3s-агент-1', 'role': 'agent', 'node': 'node2', 'status': 'running'}
         ]
-        mock_discover_nodes.return_value = mock_discovered_nodes
 
-        # Act - Should handle Unicode characters gracefully
-        handle_discover_command(basic_proxmox_config, mock_console, output_format="table", output_target="stdout")
+        # Act
+        _handle_table_output(discovered_nodes, console, "stdout")
 
         # Assert
-        mock_get_api_client.assert_called_once()
-        mock_discover_nodes.assert_called_once()
-        mock_console.print.assert_called()  # Should display table with Unicode names
+        output = console.file.getvalue()
+        assert 'k3s-服务器-1' in output
+        assert 'k3s-агент-1' in output
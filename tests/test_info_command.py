@@ -1,10 +1,13 @@
 # file: tests/test_info_command.py
 """Unit tests for the info command implementation."""
 
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from typing import Any, Dict, List, NamedTuple
+from unittest.mock import DEFAULT, MagicMock, call, patch
 
 import pytest
 
+from k3s_deploy_cli.commands import info_command
 from k3s_deploy_cli.commands.info_command import (
     _display_cluster_overview,
     _display_configured_nodes,
@@ -21,42 +24,58 @@ from k3s_deploy_cli.exceptions import ConfigurationError, ProxmoxInteractionErro
 class TestHandleInfoCommand:
     """Tests for the main handle_info_command function."""
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_version_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    @patch('k3s_deploy_cli.commands.info_command._display_cluster_overview')
-    @patch('k3s_deploy_cli.commands.info_command._display_nodes_table')
-    @patch('k3s_deploy_cli.commands.info_command._display_k3s_vm_information')
-    def test_handle_info_command_happy_path(self, mock_display_k3s, mock_display_nodes, 
-                                          mock_display_cluster, mock_get_cluster_status,
-                                          mock_get_version_info, mock_get_api_client,
-                                          basic_proxmox_config, mock_console, mock_proxmox_client):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def _class_patches(cls):
+        """Patches the info command's collaborators once for the whole class."""
+        patcher = patch.multiple(
+            info_command,
+            get_proxmox_api_client=DEFAULT,
+            get_proxmox_version_info=DEFAULT,
+            get_cluster_status=DEFAULT,
+            _display_cluster_overview=DEFAULT,
+            _display_nodes_table=DEFAULT,
+            _display_k3s_vm_information=DEFAULT,
+        )
+        mocks = patcher.start()
+        yield SimpleNamespace(**mocks)
+        patcher.stop()
+
+    @pytest.fixture
+    def class_patches(self, _class_patches):
+        """Returns the class-wide mocks with calls, return values and side effects cleared."""
+        for mock in vars(_class_patches).values():
+            mock.reset_mock(return_value=True, side_effect=True)
+        return _class_patches
+
+    def test_handle_info_command_happy_path(self, class_patches, basic_proxmox_config, mock_console,
+                                            mock_proxmox_client):
         """Test successful info command execution."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
+        class_patches.get_proxmox_api_client.return_value = mock_proxmox_client
         
         mock_version_info = {'version': '7.4', 'release': '1'}
-        mock_get_version_info.return_value = mock_version_info
+        class_patches.get_proxmox_version_info.return_value = mock_version_info
         
         mock_cluster_status = [
             {'type': 'cluster', 'name': 'test-cluster', 'quorate': 1},
             {'type': 'node', 'name': 'node1', 'online': 1},
             {'type': 'node', 'name': 'node2', 'online': 1}
         ]
-        mock_get_cluster_status.return_value = mock_cluster_status
+        class_patches.get_cluster_status.return_value = mock_cluster_status
 
         # Act
         handle_info_command(basic_proxmox_config, mock_console, discover=False)
 
         # Assert
-        mock_get_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
-        mock_get_version_info.assert_called_once_with(mock_proxmox_client)
-        mock_get_cluster_status.assert_called_once_with(mock_proxmox_client)
-        mock_display_cluster.assert_called_once()
-        mock_display_nodes.assert_called_once()
-        mock_display_k3s.assert_called_once()
-
-    def test_handle_info_command_missing_proxmox_config(self, mock_console):
+        class_patches.get_proxmox_api_client.assert_called_once_with(basic_proxmox_config['proxmox'])
+        class_patches.get_proxmox_version_info.assert_called_once_with(mock_proxmox_client)
+        class_patches.get_cluster_status.assert_called_once_with(mock_proxmox_client)
+        class_patches._display_cluster_overview.assert_called_once()
+        class_patches._display_nodes_table.assert_called_once()
+        class_patches._display_k3s_vm_information.assert_called_once()
+
+    def test_handle_info_command_missing_proxmox_config(self, class_patches, mock_console):
         """Test info command with missing Proxmox configuration."""
         # Arrange - Use empty config
         config = {}  # Missing proxmox section
@@ -66,25 +85,23 @@ class TestHandleInfoCommand:
             handle_info_command(config, mock_console)
         
         assert "Proxmox configuration is missing" in str(exc_info.value)
+        class_patches.get_proxmox_api_client.assert_not_called()
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    def test_handle_info_command_proxmox_connection_failure(self, mock_get_api_client, basic_proxmox_config, mock_console):
+    def test_handle_info_command_proxmox_connection_failure(self, class_patches, basic_proxmox_config, mock_console):
         """Test info command with Proxmox connection failure."""
         # Arrange - Use basic config and mock connection failure
-        mock_get_api_client.side_effect = ProxmoxInteractionError("Connection failed")
+        class_patches.get_proxmox_api_client.side_effect = ProxmoxInteractionError("Connection failed")
 
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
             handle_info_command(basic_proxmox_config, mock_console)
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    def test_handle_info_command_empty_cluster_status(self, mock_get_cluster_status, mock_get_api_client, 
-                                                     basic_proxmox_config, mock_console, mock_proxmox_client):
+    def test_handle_info_command_empty_cluster_status(self, class_patches, basic_proxmox_config, mock_console,
+                                                      mock_proxmox_client):
         """Test info command with empty cluster status."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_get_cluster_status.return_value = []
+        class_patches.get_proxmox_api_client.return_value = mock_proxmox_client
+        class_patches.get_cluster_status.return_value = []
 
         # Act
         handle_info_command(basic_proxmox_config, mock_console)
@@ -93,31 +110,25 @@ class TestHandleInfoCommand:
         mock_console.print.assert_called_with(
             "Could not retrieve cluster status or cluster status is empty (no nodes found)."
         )
+        class_patches._display_cluster_overview.assert_not_called()
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_version_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    @patch('k3s_deploy_cli.commands.info_command._display_k3s_vm_information')
-    def test_handle_info_command_discover_flag(self, mock_display_k3s, mock_get_dns_info, mock_get_cluster_status,
-                                             mock_get_version_info, mock_get_api_client,
-                                             basic_proxmox_config, mock_console, mock_proxmox_client, sample_version_info):
+    def test_handle_info_command_discover_flag(self, class_patches, basic_proxmox_config, mock_console,
+                                               mock_proxmox_client, sample_version_info):
         """Test info command with discover flag."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_get_version_info.return_value = sample_version_info
-        mock_get_cluster_status.return_value = [
+        class_patches.get_proxmox_api_client.return_value = mock_proxmox_client
+        class_patches.get_proxmox_version_info.return_value = sample_version_info
+        class_patches.get_cluster_status.return_value = [
             {'type': 'cluster', 'name': 'test'},
             {'type': 'node', 'name': 'node1'}
         ]
-        mock_get_dns_info.return_value = 'example.com'
 
         # Act
         handle_info_command(basic_proxmox_config, mock_console, discover=True)
 
         # Assert - Verify discover=True is passed through
-        mock_display_k3s.assert_called_once()
-        args, kwargs = mock_display_k3s.call_args
+        class_patches._display_k3s_vm_information.assert_called_once()
+        args, kwargs = class_patches._display_k3s_vm_information.call_args
         assert len(args) >= 5  # Check we have enough arguments
         assert args[4] is True  # discover parameter
 
@@ -125,7 +136,7 @@ class TestHandleInfoCommand:
 class TestDisplayClusterOverview:
     """Tests for the _display_cluster_overview function."""
 
-    @patch('k3s_deploy_cli.commands.info_command.check_proxmox_ssh_connectivity')
+    @patch.object(info_command, 'check_proxmox_ssh_connectivity')
     def test_display_cluster_overview_with_cluster_info(self, mock_ssh_check, mock_console, sample_version_info):
         """Test cluster overview display with cluster information."""
         # Arrange - Use shared fixtures
@@ -139,7 +150,7 @@ class TestDisplayClusterOverview:
         # Assert
         assert mock_console.print.call_count >= 1
 
-    @patch('k3s_deploy_cli.commands.info_command.check_proxmox_ssh_connectivity')
+    @patch.object(info_command, 'check_proxmox_ssh_connectivity')
     def test_display_cluster_overview_without_cluster_info(self, mock_ssh_check, mock_console, sample_version_info):
         """Test cluster overview display without cluster information."""
         # Arrange - Use shared fixtures
@@ -154,61 +165,79 @@ class TestDisplayClusterOverview:
         mock_console.print.assert_called()
 
 
-class TestDisplayNodesTable:
-    """Tests for the _display_nodes_table function."""
-
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    def test_display_nodes_table_successful(self, mock_get_dns_info, mock_console, mock_proxmox_client, basic_proxmox_config):
-        """Test successful nodes table display."""
-        # Arrange - Use shared fixtures
-        nodes_data = [
-            {'name': 'node1', 'status': 'online', 'local': 1, 'online': 1, 'ip': '192.168.1.10'},
-            {'name': 'node2', 'status': 'online', 'local': 0, 'online': 1, 'ip': '192.168.1.11'}
-        ]
-        mock_get_dns_info.return_value = 'example.com'
-
-        # Act
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
-
-        # Assert
-        mock_console.print.assert_called()
-        assert mock_get_dns_info.call_count == 2  # Called for each node
-
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    def test_display_nodes_table_dns_failure(self, mock_get_dns_info, mock_console, mock_proxmox_client, basic_proxmox_config):
-        """Test nodes table display with DNS lookup failure."""
-        # Arrange - Use shared fixtures
-        nodes_data = [{'name': 'node1', 'status': 'online', 'local': 1, 'online': 1, 'ip': '192.168.1.10'}]
-        mock_get_dns_info.side_effect = Exception("DNS lookup failed")
+class NodesTableCase(NamedTuple):
+    """Inputs and expected lookups for one _display_nodes_table scenario."""
+
+    nodes: List[Dict[str, Any]]
+    dns_side_effect: Any
+    snippet_side_effect: Any
+
+
+_NODE1 = {'name': 'pve-node1', 'status': 'online', 'local': 1, 'online': 1, 'ip': '192.168.1.10'}
+_NODE2 = {'name': 'pve-node2', 'status': 'online', 'local': 0, 'online': 1, 'ip': '192.168.1.11'}
+_LOCAL_SNIPPETS = {"storage_name": "local", "enabled": True, "active": True, "type": "dir"}
+_NFS_SNIPPETS = {"storage_name": "snippets-nfs", "enabled": True, "active": True, "type": "nfs"}
+
+NODES_TABLE_CASES = [
+    pytest.param(
+        NodesTableCase([_NODE1, _NODE2], ['example.com', 'example.com'], [{}, {}]),
+        id="successful",
+    ),
+    pytest.param(
+        NodesTableCase([_NODE1], Exception("DNS lookup failed"), [{}]),
+        id="dns_failure",
+    ),
+    pytest.param(
+        NodesTableCase([], None, None),
+        id="empty_nodes",
+    ),
+    pytest.param(
+        NodesTableCase([_NODE1, _NODE2], ["example.local", "N/A"], [_LOCAL_SNIPPETS, {}]),
+        id="with_snippet_storage",
+    ),
+    pytest.param(
+        NodesTableCase([_NODE1], ["example.local"], ProxmoxInteractionError("API error")),
+        id="snippet_storage_error_handling",
+    ),
+    pytest.param(
+        NodesTableCase([_NODE1, _NODE2], ["example.local", "other.local"], [_LOCAL_SNIPPETS, _NFS_SNIPPETS]),
+        id="multiple_snippet_storages",
+    ),
+]
 
-        # Act - Should not raise exception, should handle gracefully
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
 
-        # Assert
-        mock_console.print.assert_called()  # Should still display table with "N/A"
-        mock_get_dns_info.assert_called_once_with(mock_proxmox_client, 'node1')
+class TestDisplayNodesTable:
+    """Tests for the _display_nodes_table function."""
 
-    def test_display_nodes_table_empty_nodes(self, mock_console, mock_proxmox_client, basic_proxmox_config):
-        """Test nodes table display with empty nodes list."""
-        # Arrange - Use shared fixtures
-        nodes_data = []
+    @pytest.mark.parametrize("case", NODES_TABLE_CASES)
+    @patch.object(info_command, 'get_node_snippet_storage')
+    @patch.object(info_command, 'get_node_dns_info')
+    def test_display_nodes_table(self, mock_get_dns_info, mock_get_snippet_storage, case,
+                                 mock_console, mock_proxmox_client, basic_proxmox_config):
+        """DNS and snippet storage failures are rendered in the table instead of raised."""
+        # Arrange
+        mock_get_dns_info.side_effect = case.dns_side_effect
+        mock_get_snippet_storage.side_effect = case.snippet_side_effect
+        expected_calls = [call(mock_proxmox_client, node['name']) for node in case.nodes]
 
         # Act
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
+        _display_nodes_table(mock_console, case.nodes, mock_proxmox_client, basic_proxmox_config)
 
-        # Assert
-        mock_console.print.assert_called()
+        # Assert - one table, one DNS and one snippet storage lookup per node
+        mock_console.print.assert_called_once()
+        assert mock_get_dns_info.call_args_list == expected_calls
+        assert mock_get_snippet_storage.call_args_list == expected_calls
 
 
 class TestDisplayK3sVmInformation:
     """Tests for the _display_k3s_vm_information function."""
 
-    @patch('k3s_deploy_cli.commands.info_command._display_tag_based_k3s_vms')
-    def test_display_k3s_vm_information_discover_mode(self, mock_display_tag_based, mock_console, mock_proxmox_client):
+    @patch.object(info_command, '_display_tag_based_k3s_vms')
+    def test_display_k3s_vm_information_discover_mode(self, mock_display_tag_based, mock_console, mock_proxmox_client, sample_online_node):
         """Test K3s VM information display in discover mode."""
         # Arrange - Use shared fixtures
         config = {'nodes': [{'vmid': 100}]}
-        nodes_data = [{'name': 'node1'}]
+        nodes_data = sample_online_node
 
         # Act
         _display_k3s_vm_information(mock_console, config, mock_proxmox_client, nodes_data, discover=True)
@@ -216,12 +245,12 @@ class TestDisplayK3sVmInformation:
         # Assert
         mock_display_tag_based.assert_called_once_with(mock_console, mock_proxmox_client, nodes_data, True, [{'vmid': 100}])
 
-    @patch('k3s_deploy_cli.commands.info_command._display_configured_nodes')
-    def test_display_k3s_vm_information_configured_nodes(self, mock_display_configured, mock_console, mock_proxmox_client):
+    @patch.object(info_command, '_display_configured_nodes')
+    def test_display_k3s_vm_information_configured_nodes(self, mock_display_configured, mock_console, mock_proxmox_client, sample_online_node):
         """Test K3s VM information display with configured nodes."""
         # Arrange - Use shared fixtures
         config = {'nodes': [{'vmid': 100, 'role': 'server'}]}
-        nodes_data = [{'name': 'node1'}]
+        nodes_data = sample_online_node
 
         # Act
         _display_k3s_vm_information(mock_console, config, mock_proxmox_client, nodes_data, discover=False)
@@ -229,12 +258,12 @@ class TestDisplayK3sVmInformation:
         # Assert
         mock_display_configured.assert_called_once()
 
-    @patch('k3s_deploy_cli.commands.info_command._display_tag_based_k3s_vms')
-    def test_display_k3s_vm_information_fallback_to_discovery(self, mock_display_tag_based, mock_console, mock_proxmox_client):
+    @patch.object(info_command, '_display_tag_based_k3s_vms')
+    def test_display_k3s_vm_information_fallback_to_discovery(self, mock_display_tag_based, mock_console, mock_proxmox_client, sample_online_node):
         """Test K3s VM information display fallback to discovery mode."""
         # Arrange - Use shared fixtures
         config = {}  # No nodes configured
-        nodes_data = [{'name': 'node1'}]
+        nodes_data = sample_online_node
 
         # Act
         _display_k3s_vm_information(mock_console, config, mock_proxmox_client, nodes_data, discover=False)
@@ -246,12 +275,12 @@ class TestDisplayK3sVmInformation:
 class TestDisplayTagBasedK3sVms:
     """Tests for the _display_tag_based_k3s_vms function."""
 
-    @patch('k3s_deploy_cli.commands.info_command.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.commands.info_command._display_k3s_vms_table')
-    def test_display_tag_based_k3s_vms_with_vms(self, mock_display_table, mock_get_vms, mock_console, mock_proxmox_client, sample_vm_list):
+    @patch.object(info_command, 'get_vms_with_k3s_tags')
+    @patch.object(info_command, '_display_k3s_vms_table')
+    def test_display_tag_based_k3s_vms_with_vms(self, mock_display_table, mock_get_vms, mock_console, mock_proxmox_client, sample_vm_list, sample_online_node):
         """Test tag-based K3s VMs display with VMs found."""
         # Arrange - Use shared fixtures
-        nodes_data = [{"name": "node1", "online": 1}]
+        nodes_data = sample_online_node
         discover = True
         configured_nodes = []
         mock_get_vms.return_value = sample_vm_list
@@ -261,13 +290,13 @@ class TestDisplayTagBasedK3sVms:
 
         # Assert
         mock_get_vms.assert_called_once_with(mock_proxmox_client, "node1")
-        mock_display_table.assert_called_once_with(mock_console, sample_vm_list)
+        mock_display_table.assert_called_once_with(mock_console, list(sample_vm_list))
 
-    @patch('k3s_deploy_cli.commands.info_command.get_vms_with_k3s_tags')
-    def test_display_tag_based_k3s_vms_no_vms_found(self, mock_get_vms, mock_console, mock_proxmox_client):
+    @patch.object(info_command, 'get_vms_with_k3s_tags')
+    def test_display_tag_based_k3s_vms_no_vms_found(self, mock_get_vms, mock_console, mock_proxmox_client, sample_online_node):
         """Test tag-based K3s VMs display with no VMs found."""
         # Arrange - Use shared fixtures
-        nodes_data = [{"name": "node1", "online": 1}]
+        nodes_data = sample_online_node
         discover = True
         configured_nodes = []
         mock_get_vms.return_value = []
@@ -279,11 +308,11 @@ class TestDisplayTagBasedK3sVms:
         mock_get_vms.assert_called_once_with(mock_proxmox_client, "node1")
         mock_console.print.assert_called()  # Should print "no VMs found" message
 
-    @patch('k3s_deploy_cli.commands.info_command.get_vms_with_k3s_tags')
-    def test_display_tag_based_k3s_vms_api_error(self, mock_get_vms, mock_console, mock_proxmox_client):
+    @patch.object(info_command, 'get_vms_with_k3s_tags')
+    def test_display_tag_based_k3s_vms_api_error(self, mock_get_vms, mock_console, mock_proxmox_client, sample_online_node):
         """Test tag-based K3s VMs display with API error."""
         # Arrange - Use shared fixtures
-        nodes_data = [{"name": "node1", "online": 1}]
+        nodes_data = sample_online_node
         discover = True
         configured_nodes = []
         mock_get_vms.side_effect = ProxmoxInteractionError("API error")
@@ -298,7 +327,7 @@ class TestDisplayTagBasedK3sVms:
 class TestDisplayConfiguredNodes:
     """Tests for the _display_configured_nodes function."""
 
-    @patch('k3s_deploy_cli.commands.info_command._get_vm_info_by_vmid')
+    @patch.object(info_command, '_get_vm_info_by_vmid')
     def test_display_configured_nodes_successful(self, mock_get_vm_info, mock_console, mock_proxmox_client):
         """Test successful display of configured nodes."""
         # Arrange - Use shared fixtures
@@ -320,7 +349,7 @@ class TestDisplayConfiguredNodes:
         assert mock_get_vm_info.call_count == 2
         mock_console.print.assert_called()  # Should print the configuration table
 
-    @patch('k3s_deploy_cli.commands.info_command._get_vm_info_by_vmid')
+    @patch.object(info_command, '_get_vm_info_by_vmid')
     def test_display_configured_nodes_vm_not_found(self, mock_get_vm_info, mock_console, mock_proxmox_client):
         """Test display of configured nodes when VM is not found."""
         # Arrange - Use shared fixtures
@@ -338,25 +367,15 @@ class TestDisplayConfiguredNodes:
 class TestDisplayK3sVmsTable:
     """Tests for the _display_k3s_vms_table function."""
 
-    def test_display_k3s_vms_table_with_vms(self, mock_console):
-        """Test K3s VMs table display with VMs."""
-        # Arrange - Use shared fixtures
-        vms_data = [
+    @pytest.mark.parametrize("vms_data", [
+        pytest.param([
             {'vmid': 100, 'name': 'k3s-server-1', 'status': 'running', 'node': 'node1', 'role': 'server'},
             {'vmid': 101, 'name': 'k3s-agent-1', 'status': 'stopped', 'node': 'node2', 'role': 'agent'}
-        ]
-
-        # Act
-        _display_k3s_vms_table(mock_console, vms_data)
-
-        # Assert
-        mock_console.print.assert_called()
-
-    def test_display_k3s_vms_table_empty_list(self, mock_console):
-        """Test K3s VMs table display with empty list."""
-        # Arrange - Use shared fixtures
-        vms_data = []
-
+        ], id="with_vms"),
+        pytest.param([], id="empty_list"),
+    ])
+    def test_display_k3s_vms_table(self, vms_data, mock_console):
+        """Test K3s VMs table display."""
         # Act
         _display_k3s_vms_table(mock_console, vms_data)
 
@@ -367,33 +386,43 @@ class TestDisplayK3sVmsTable:
 class TestGetVmInfoByVmid:
     """Tests for the _get_vm_info_by_vmid function."""
 
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    def test_get_vm_info_by_vmid_found(self, mock_get_cluster_status):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def _vm_lookup_mocks(cls):
+        """Builds the client and per-node mocks once for the whole class."""
+        node1 = MagicMock()
+        node2 = MagicMock()
+        client = MagicMock()
+        return SimpleNamespace(client=client, node1=node1, node2=node2)
+
+    @pytest.fixture
+    def vm_lookup_mocks(self, _vm_lookup_mocks):
+        """Returns the class-wide mocks reset to: no VMs on node1, VM 100 on node2."""
+        mocks = _vm_lookup_mocks
+        for mock in vars(mocks).values():
+            mock.reset_mock(return_value=True, side_effect=True)
+        mocks.node1.qemu.get.return_value = []
+        mocks.node2.qemu.get.return_value = [
+            {'vmid': 100, 'name': 'test-vm', 'status': 'running'}
+        ]
+        mocks.client.nodes.side_effect = {'node1': mocks.node1, 'node2': mocks.node2}.__getitem__
+        return mocks
+
+    @patch.object(info_command, 'get_cluster_status')
+    def test_get_vm_info_by_vmid_found(self, mock_get_cluster_status, vm_lookup_mocks):
         """Test getting VM info when VM is found."""
         # Arrange
-        proxmox_client = MagicMock()
         vmid = 100
         
-        # Mock cluster status response
+        # Mock cluster status response - VM 100 lives on node2
         mock_get_cluster_status.return_value = [
             {'type': 'cluster', 'name': 'test-cluster'},
             {'type': 'node', 'name': 'node1', 'online': 1},
             {'type': 'node', 'name': 'node2', 'online': 1}
         ]
-        
-        # Mock VM found on node2
-        node1_mock = MagicMock()
-        node1_mock.qemu.get.return_value = []  # No VMs on node1
-        
-        node2_mock = MagicMock()
-        node2_mock.qemu.get.return_value = [
-            {'vmid': 100, 'name': 'test-vm', 'status': 'running'}
-        ]
-        
-        proxmox_client.nodes.side_effect = lambda name: node1_mock if name == 'node1' else node2_mock
 
         # Act
-        result = _get_vm_info_by_vmid(proxmox_client, vmid)
+        result = _get_vm_info_by_vmid(vm_lookup_mocks.client, vmid)
 
         # Assert
         assert result is not None
@@ -401,34 +430,28 @@ class TestGetVmInfoByVmid:
         assert result['name'] == 'test-vm'
         assert result['node'] == 'node2'
 
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    def test_get_vm_info_by_vmid_not_found(self, mock_get_cluster_status):
+    @patch.object(info_command, 'get_cluster_status')
+    def test_get_vm_info_by_vmid_not_found(self, mock_get_cluster_status, vm_lookup_mocks):
         """Test getting VM info when VM is not found."""
         # Arrange
-        proxmox_client = MagicMock()
         vmid = 999
         
-        # Mock cluster status response
+        # Mock cluster status response - node1 has no VMs
         mock_get_cluster_status.return_value = [
             {'type': 'node', 'name': 'node1', 'online': 1}
         ]
-        
-        # Mock VM not found
-        node_mock = MagicMock()
-        node_mock.qemu.get.return_value = []  # No VMs found
-        proxmox_client.nodes.return_value = node_mock
 
         # Act
-        result = _get_vm_info_by_vmid(proxmox_client, vmid)
+        result = _get_vm_info_by_vmid(vm_lookup_mocks.client, vmid)
 
         # Assert
         assert result is None
+        vm_lookup_mocks.client.nodes.assert_called_once_with('node1')
 
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    def test_get_vm_info_by_vmid_api_error(self, mock_get_cluster_status):
+    @patch.object(info_command, 'get_cluster_status')
+    def test_get_vm_info_by_vmid_api_error(self, mock_get_cluster_status, vm_lookup_mocks):
         """Test getting VM info with API error."""
         # Arrange
-        proxmox_client = MagicMock()
         vmid = 100
         
         # Mock API error at cluster level
@@ -436,60 +459,67 @@ class TestGetVmInfoByVmid:
 
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
-            _get_vm_info_by_vmid(proxmox_client, vmid)
+            _get_vm_info_by_vmid(vm_lookup_mocks.client, vmid)
+        vm_lookup_mocks.client.nodes.assert_not_called()
+
+
+@pytest.fixture
+def patched_info_deps():
+    """Patches the Proxmox API collaborators shared by the end-to-end info command tests."""
+    with patch.multiple(
+        info_command,
+        get_proxmox_api_client=DEFAULT,
+        get_proxmox_version_info=DEFAULT,
+        get_cluster_status=DEFAULT,
+        get_node_dns_info=DEFAULT,
+    ) as mocks:
+        yield SimpleNamespace(**mocks)
 
 
 class TestInfoCommandIntegration:
     """Integration-style tests for the info command."""
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_version_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_vms_with_k3s_tags')
-    def test_info_command_full_flow_tag_discovery(self, mock_get_vms, mock_get_dns_info, mock_get_cluster_status,
-                                                 mock_get_version_info, mock_get_api_client,
+    @pytest.mark.slow
+    @patch.object(info_command, 'get_vms_with_k3s_tags')
+    def test_info_command_full_flow_tag_discovery(self, mock_get_vms, patched_info_deps,
                                                  basic_proxmox_config, mock_console, mock_proxmox_client, 
                                                  sample_version_info, sample_cluster_status, sample_vm_list):
         """Test complete info command flow with tag-based discovery."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_get_version_info.return_value = sample_version_info
-        mock_get_cluster_status.return_value = sample_cluster_status
-        mock_get_dns_info.return_value = 'example.com'  # Return string instead of MagicMock
+        patched_info_deps.get_proxmox_api_client.return_value = mock_proxmox_client
+        patched_info_deps.get_proxmox_version_info.return_value = sample_version_info
+        patched_info_deps.get_cluster_status.return_value = sample_cluster_status
+        patched_info_deps.get_node_dns_info.return_value = 'example.com'  # Return string instead of MagicMock
         mock_get_vms.return_value = sample_vm_list
 
         # Act
         handle_info_command(basic_proxmox_config, mock_console, discover=True)
 
         # Assert - Verify all major components were called
-        mock_get_api_client.assert_called_once()
-        mock_get_version_info.assert_called_once()
-        mock_get_cluster_status.assert_called_once()
+        patched_info_deps.get_proxmox_api_client.assert_called_once()
+        patched_info_deps.get_proxmox_version_info.assert_called_once()
+        patched_info_deps.get_cluster_status.assert_called_once()
         # get_vms_with_k3s_tags should be called once per online node (node1 and node2)
-        assert mock_get_vms.call_count == 2
-        mock_get_vms.assert_any_call(mock_proxmox_client, 'node1')
-        mock_get_vms.assert_any_call(mock_proxmox_client, 'node2')
+        assert mock_get_vms.call_args_list == [
+            call(mock_proxmox_client, 'node1'),
+            call(mock_proxmox_client, 'node2'),
+        ]
         
         # Verify console output was generated
         assert mock_console.print.call_count > 0
 
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_api_client')
-    @patch('k3s_deploy_cli.commands.info_command.get_proxmox_version_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_cluster_status')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    def test_info_command_full_flow_configured_nodes(self, mock_get_dns_info, mock_get_cluster_status,
-                                                   mock_get_version_info, mock_get_api_client,
+    @pytest.mark.slow
+    def test_info_command_full_flow_configured_nodes(self, patched_info_deps,
                                                    full_config, mock_console, mock_proxmox_client, sample_version_info):
         """Test complete info command flow with configured nodes."""
         # Arrange - Use shared fixtures
-        mock_get_api_client.return_value = mock_proxmox_client
-        mock_get_version_info.return_value = sample_version_info
-        mock_get_cluster_status.return_value = [
+        patched_info_deps.get_proxmox_api_client.return_value = mock_proxmox_client
+        patched_info_deps.get_proxmox_version_info.return_value = sample_version_info
+        patched_info_deps.get_cluster_status.return_value = [
             {'type': 'cluster', 'name': 'test-cluster'},
             {'type': 'node', 'name': 'node1', 'online': 1, 'local': 1}  # Added online: 1
         ]
-        mock_get_dns_info.return_value = 'example.com'  # Return string instead of MagicMock
+        patched_info_deps.get_node_dns_info.return_value = 'example.com'  # Return string instead of MagicMock
         
         # Mock VM lookup for configured node
         mock_proxmox_client.nodes.get.return_value.qemu.get.return_value = [
@@ -500,146 +530,7 @@ class TestInfoCommandIntegration:
         handle_info_command(full_config, mock_console, discover=False)
 
         # Assert
-        mock_get_api_client.assert_called_once()
-        mock_get_version_info.assert_called_once()
+        patched_info_deps.get_proxmox_api_client.assert_called_once()
+        patched_info_deps.get_proxmox_version_info.assert_called_once()
         # Don't assert call count for get_cluster_status since it's called by multiple functions
         assert mock_console.print.call_count > 0
-
-
-class TestNodesTableWithSnippetStorage:
-    """Tests for the nodes table with snippet storage information."""
-    
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_snippet_storage')
-    def test_display_nodes_table_with_snippet_storage(self, mock_get_snippet_storage, 
-                                                     mock_get_dns_info, mock_console, 
-                                                     mock_proxmox_client, basic_proxmox_config):
-        """Test nodes table displays snippet storage information correctly."""
-        # Arrange
-        nodes_data = [
-            {
-                "name": "pve-node1",
-                "local": 1,
-                "online": 1,
-                "ip": "192.168.1.10"
-            },
-            {
-                "name": "pve-node2", 
-                "local": 0,
-                "online": 1,
-                "ip": "192.168.1.11"
-            }
-        ]
-        
-        # Mock DNS info
-        mock_get_dns_info.side_effect = ["example.local", "N/A"]
-        
-        # Mock snippet storage info - node1 has snippets, node2 doesn't
-        mock_get_snippet_storage.side_effect = [
-            {
-                "storage_name": "local",
-                "enabled": True,
-                "active": True,
-                "type": "dir"
-            },
-            {}  # No snippet storage
-        ]
-        
-        # Act
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
-        
-        # Assert
-        mock_console.print.assert_called_once()
-        
-        # Verify snippet storage function was called for each node
-        assert mock_get_snippet_storage.call_count == 2
-        mock_get_snippet_storage.assert_any_call(mock_proxmox_client, "pve-node1")
-        mock_get_snippet_storage.assert_any_call(mock_proxmox_client, "pve-node2")
-        
-        # Check that table was created with snippet storage column
-        # Note: We can't easily test the exact table content without more complex mocking
-        # but we can verify the function was called and no exceptions were raised
-    
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_snippet_storage')
-    def test_display_nodes_table_snippet_storage_error_handling(self, mock_get_snippet_storage,
-                                                               mock_get_dns_info, mock_console,
-                                                               mock_proxmox_client, basic_proxmox_config):
-        """Test nodes table handles snippet storage errors gracefully."""
-        # Arrange
-        nodes_data = [
-            {
-                "name": "pve-node1",
-                "local": 1,
-                "online": 1,
-                "ip": "192.168.1.10"
-            }
-        ]
-        
-        # Mock DNS info success
-        mock_get_dns_info.return_value = "example.local"
-        
-        # Mock snippet storage error
-        mock_get_snippet_storage.side_effect = ProxmoxInteractionError("API error")
-        
-        # Act - Should not raise exception
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
-        
-        # Assert
-        mock_console.print.assert_called_once()
-        mock_get_snippet_storage.assert_called_once_with(mock_proxmox_client, "pve-node1")
-        
-        # Verify error was logged but execution continued
-        # (The actual implementation should show "Error" or "N/A" in the snippet storage column)
-    
-    @patch('k3s_deploy_cli.commands.info_command.get_node_dns_info')
-    @patch('k3s_deploy_cli.commands.info_command.get_node_snippet_storage')
-    def test_display_nodes_table_multiple_snippet_storages(self, mock_get_snippet_storage,
-                                                          mock_get_dns_info,
-                                                          mock_console, mock_proxmox_client, basic_proxmox_config):
-        """Test nodes table handles multiple snippet storages correctly."""
-        # Arrange
-        nodes_data = [
-            {
-                "name": "pve-node1",
-                "local": 1,
-                "online": 1,
-                "ip": "192.168.1.10"
-            },
-            {
-                "name": "pve-node2",
-                "local": 0,
-                "online": 1,
-                "ip": "192.168.1.11"
-            }
-        ]
-        
-        # Mock DNS info
-        mock_get_dns_info.side_effect = ["example.local", "other.local"]
-        
-        # Mock different snippet storage scenarios
-        mock_get_snippet_storage.side_effect = [
-            {
-                "storage_name": "local",
-                "enabled": True,
-                "active": True,
-                "type": "dir"
-            },
-            {
-                "storage_name": "snippets-nfs",
-                "enabled": True,
-                "active": True,
-                "type": "nfs"
-            }
-        ]
-        
-        # Act
-        _display_nodes_table(mock_console, nodes_data, mock_proxmox_client, basic_proxmox_config)
-        
-        # Assert
-        mock_console.print.assert_called_once()
-        assert mock_get_snippet_storage.call_count == 2
-        
-        # Verify both nodes were checked for snippet storage
-        mock_get_snippet_storage.assert_any_call(mock_proxmox_client, "pve-node1")
-        mock_get_snippet_storage.assert_any_call(mock_proxmox_client, "pve-node2")
@@ -3,153 +3,114 @@
 
 import pytest
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import MagicMock, Mock, patch
-from argparse import Namespace
 
+from k3s_deploy_cli import main as main_module
 from k3s_deploy_cli.main import main, _dispatch_command
 from k3s_deploy_cli.exceptions import ConfigurationError, K3sDeployCLIError, ProxmoxInteractionError
 
 
+_CONFIG_PATH = Path('config.json')
+_BASE_CONFIG = MappingProxyType({'proxmox': MappingProxyType({'host': 'test.com'})})
+_MAIN_COLLABORATORS = ('parse_args', 'configure_logging', 'load_configuration', '_dispatch_command')
+
+
+@pytest.fixture
+def patch_main_symbols(monkeypatch):
+    """Swaps main()'s collaborators for mocks by plain attribute assignment."""
+    mocks = SimpleNamespace(**{name: MagicMock() for name in _MAIN_COLLABORATORS})
+    for name, mock in vars(mocks).items():
+        monkeypatch.setattr(main_module, name, mock)
+    return mocks
+
+
+@pytest.fixture
+def base_args():
+    """Returns a factory for main() arguments: an 'info' run with default flags, plus overrides."""
+    def make_args(**overrides):
+        return SimpleNamespace(**{'command': 'info', 'verbose': False, 'debug': False, 'config': _CONFIG_PATH, **overrides})
+    return make_args
+
+
+@pytest.fixture
+def base_config():
+    """Provides the minimal loaded configuration (read-only, shared)."""
+    return _BASE_CONFIG
+
+
 class TestMainEntryPoint:
     """Tests for the main() function - the primary entry point."""
 
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    @patch('k3s_deploy_cli.main._dispatch_command')
-    @patch('k3s_deploy_cli.main.Console')
-    def test_main_happy_path(self, mock_console, mock_dispatch, mock_load_config, 
-                           mock_configure_logging, mock_parse_args):
-        """Test successful main execution with valid arguments."""
+    @pytest.mark.parametrize("args_overrides, dispatch_side_effect, expected_code", [
+        pytest.param({}, None, 0, id="happy_path"),
+        pytest.param({}, K3sDeployCLIError("CLI operation failed"), 1, id="cli_error"),
+        pytest.param({'debug': True}, ValueError("Unexpected error"), 1, id="unexpected_error"),
+        pytest.param({'verbose': True, 'debug': True}, None, 0, id="verbose_debug_logging"),
+        pytest.param({'config': Path('/custom/path/config.json')}, None, 0, id="custom_config_path"),
+    ])
+    def test_main_dispatch_variants(self, patch_main_symbols, base_args, base_config,
+                                    args_overrides, dispatch_side_effect, expected_code):
+        """Test main() runs the full pipeline and maps dispatch outcomes to exit codes."""
         # Arrange
-        mock_args = Namespace(
-            command='info',
-            verbose=False,
-            debug=False,
-            config=Path('config.json')
+        mock_args = base_args(**args_overrides)
+        patch_main_symbols.parse_args.return_value = mock_args
+        patch_main_symbols.load_configuration.return_value = base_config
+        patch_main_symbols._dispatch_command.return_value = 0
+        patch_main_symbols._dispatch_command.side_effect = dispatch_side_effect
+        console = MagicMock()
+
+        # Act
+        exit_code = main(console=console)
+
+        # Assert
+        assert exit_code == expected_code
+        patch_main_symbols.parse_args.assert_called_once()
+        patch_main_symbols.configure_logging.assert_called_once_with(
+            verbose=mock_args.verbose, debug=mock_args.debug
         )
-        mock_parse_args.return_value = mock_args
-        mock_config = {'proxmox': {'host': 'test.com'}}
-        mock_load_config.return_value = mock_config
-        mock_console_instance = MagicMock()
-        mock_console.return_value = mock_console_instance
-
-        # Act & Assert - Should not raise any exceptions
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        # Verify successful exit code
-        assert exc_info.value.code == 0
-        
-        # Verify all components were called correctly
-        mock_parse_args.assert_called_once()
-        mock_configure_logging.assert_called_once_with(verbose=False, debug=False)
-        mock_load_config.assert_called_once()
-        mock_dispatch.assert_called_once_with(mock_args, mock_config, mock_console_instance)
-
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    def test_main_no_command_provided(self, mock_configure_logging, mock_parse_args):
-        """Test main() when no command is provided."""
+        patch_main_symbols.load_configuration.assert_called_once()
+        assert patch_main_symbols.load_configuration.call_args.args[0] == mock_args.config
+        patch_main_symbols._dispatch_command.assert_called_once_with(mock_args, base_config, console)
+
+    def test_main_returns_dispatch_exit_code(self, patch_main_symbols, base_args, base_config):
+        """Test main() returns the exit code reported by the dispatched command."""
         # Arrange
-        mock_args = Namespace(
-            command=None,
-            verbose=False,
-            debug=False,
-            config=Path('config.json')
-        )
-        mock_parse_args.return_value = mock_args
+        patch_main_symbols.parse_args.return_value = base_args(command='provision')
+        patch_main_symbols.load_configuration.return_value = base_config
+        patch_main_symbols._dispatch_command.return_value = 1
 
         # Act & Assert
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        # Verify error exit code
-        assert exc_info.value.code == 1
+        assert main() == 1
 
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    def test_main_configuration_error(self, mock_load_config, mock_configure_logging, mock_parse_args):
-        """Test main() handling of configuration errors."""
+    def test_main_no_command_provided(self, patch_main_symbols, base_args):
+        """Test main() when no command is provided."""
         # Arrange
-        mock_args = Namespace(
-            command='info',
-            verbose=False,
-            debug=False,
-            config=Path('invalid_config.json')
-        )
-        mock_parse_args.return_value = mock_args
-        mock_load_config.side_effect = ConfigurationError("Config file not found")
+        mock_args = base_args(command=None)
+        patch_main_symbols.parse_args.return_value = mock_args
 
-        # Act & Assert
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        assert exc_info.value.code == 1
-
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    @patch('k3s_deploy_cli.main._dispatch_command')
-    @patch('k3s_deploy_cli.main.Console')
-    def test_main_cli_error(self, mock_console, mock_dispatch, mock_load_config, 
-                          mock_configure_logging, mock_parse_args):
-        """Test main() handling of CLI errors."""
-        # Arrange
-        mock_args = Namespace(
-            command='info',
-            verbose=False,
-            debug=False,
-            config=Path('config.json')
-        )
-        mock_parse_args.return_value = mock_args
-        mock_config = {'proxmox': {'host': 'test.com'}}
-        mock_load_config.return_value = mock_config
-        mock_dispatch.side_effect = K3sDeployCLIError("CLI operation failed")
+        # Act & Assert - Verify error exit code
+        assert main() == 1
 
-        # Act & Assert
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        assert exc_info.value.code == 1
-
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    @patch('k3s_deploy_cli.main._dispatch_command')
-    @patch('k3s_deploy_cli.main.Console')
-    def test_main_unexpected_error(self, mock_console, mock_dispatch, mock_load_config, 
-                                 mock_configure_logging, mock_parse_args):
-        """Test main() handling of unexpected errors."""
+    def test_main_configuration_error(self, patch_main_symbols, base_args):
+        """Test main() handling of configuration errors."""
         # Arrange
-        mock_args = Namespace(
-            command='info',
-            verbose=False,
-            debug=True,  # Test debug mode
-            config=Path('config.json')
-        )
-        mock_parse_args.return_value = mock_args
-        mock_config = {'proxmox': {'host': 'test.com'}}
-        mock_load_config.return_value = mock_config
-        mock_dispatch.side_effect = ValueError("Unexpected error")
+        mock_args = base_args(config=Path('invalid_config.json'))
+        patch_main_symbols.parse_args.return_value = mock_args
+        patch_main_symbols.load_configuration.side_effect = ConfigurationError("Config file not found")
 
         # Act & Assert
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        assert exc_info.value.code == 1
-
+        assert main() == 1
 
 class TestCommandDispatch:
     """Tests for the _dispatch_command() function."""
 
-    @patch('k3s_deploy_cli.main.InfoCommand')
-    def test_dispatch_info_command(self, mock_info_command_class):
+    @patch.object(main_module, 'InfoCommand')
+    def test_dispatch_info_command(self, mock_info_command_class, base_config):
         """Test dispatching to info command."""
         # Arrange
-        args = Namespace(command='info', discover=False)
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='info', discover=False)
+        config = base_config
         console = MagicMock()
         mock_info_command = MagicMock()
         mock_info_command_class.return_value = mock_info_command
@@ -161,12 +122,12 @@ class TestCommandDispatch:
         mock_info_command_class.assert_called_once_with(config, console)
         mock_info_command.execute.assert_called_once_with(discover=False)
 
-    @patch('k3s_deploy_cli.main.InfoCommand')
-    def test_dispatch_info_command_with_discover(self, mock_info_command_class):
+    @patch.object(main_module, 'InfoCommand')
+    def test_dispatch_info_command_with_discover(self, mock_info_command_class, base_config):
         """Test dispatching to info command with discover flag."""
         # Arrange
-        args = Namespace(command='info', discover=True)
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='info', discover=True)
+        config = base_config
         console = MagicMock()
         mock_info_command = MagicMock()
         mock_info_command_class.return_value = mock_info_command
@@ -178,12 +139,12 @@ class TestCommandDispatch:
         mock_info_command_class.assert_called_once_with(config, console)
         mock_info_command.execute.assert_called_once_with(discover=True)
 
-    @patch('k3s_deploy_cli.main.DiscoverCommand')
-    def test_dispatch_discover_command(self, mock_discover_command_class):
+    @patch.object(main_module, 'DiscoverCommand')
+    def test_dispatch_discover_command(self, mock_discover_command_class, base_config):
         """Test dispatching to discover command."""
         # Arrange
-        args = Namespace(command='discover', format='table', output='stdout')
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='discover', format='table', output='stdout')
+        config = base_config
         console = MagicMock()
         mock_discover_command = MagicMock()
         mock_discover_command_class.return_value = mock_discover_command
@@ -195,12 +156,12 @@ class TestCommandDispatch:
         mock_discover_command_class.assert_called_once_with(config, console)
         mock_discover_command.execute.assert_called_once_with('table', 'stdout')
 
-    @patch('k3s_deploy_cli.main.DiscoverCommand')
-    def test_dispatch_discover_command_json_format(self, mock_discover_command_class):
+    @patch.object(main_module, 'DiscoverCommand')
+    def test_dispatch_discover_command_json_format(self, mock_discover_command_class, base_config):
         """Test dispatching to discover command with JSON format."""
         # Arrange
-        args = Namespace(command='discover', format='json', output='file')
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='discover', format='json', output='file')
+        config = base_config
         console = MagicMock()
         mock_discover_command = MagicMock()
         mock_discover_command_class.return_value = mock_discover_command
@@ -212,25 +173,58 @@ class TestCommandDispatch:
         mock_discover_command_class.assert_called_once_with(config, console)
         mock_discover_command.execute.assert_called_once_with('json', 'file')
 
-    def test_dispatch_unknown_command(self):
+    @pytest.mark.parametrize("args, command_class, needs_console", [
+        pytest.param(SimpleNamespace(command='info', discover=False), 'InfoCommand', True, id="info"),
+        pytest.param(SimpleNamespace(command='discover', format='table', output='stdout'), 'DiscoverCommand', True, id="discover"),
+        pytest.param(SimpleNamespace(command='start'), 'handle_start_command', False, id="start"),
+    ])
+    def test_dispatch_creates_console_only_when_needed(self, monkeypatch, base_config, args, command_class, needs_console):
+        """Test that a Console is only built for commands that render through Rich."""
+        # Arrange
+        mock_console_class = MagicMock()
+        mock_handler = MagicMock()
+        monkeypatch.setattr(main_module, 'Console', mock_console_class)
+        monkeypatch.setattr(main_module, command_class, mock_handler)
+
+        # Act
+        _dispatch_command(args, base_config)
+
+        # Assert
+        assert mock_console_class.called is needs_console
+        if needs_console:
+            mock_handler.assert_called_once_with(base_config, mock_console_class.return_value)
+
+    def test_dispatch_unknown_command(self, base_config):
         """Test dispatching unknown command."""
         # Arrange
-        args = Namespace(command='unknown')
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='unknown')
+        config = base_config
         console = MagicMock()
 
         # Act & Assert
-        with pytest.raises(SystemExit) as exc_info:
-            _dispatch_command(args, config, console)
-        
-        assert exc_info.value.code == 2
+        assert _dispatch_command(args, config, console) == 2
+
+    @pytest.mark.parametrize("vmid, provision_result, expected_code", [
+        pytest.param('100,101', True, 0, id="success"),
+        pytest.param('100,101', False, 1, id="provision_failed"),
+        pytest.param('100,abc', True, 1, id="invalid_vmid"),
+    ])
+    def test_dispatch_provision_exit_codes(self, monkeypatch, base_config, vmid, provision_result, expected_code):
+        """Test provision dispatch returns an exit code instead of exiting the process."""
+        # Arrange
+        mock_provision = MagicMock(return_value=provision_result)
+        monkeypatch.setattr(main_module, 'handle_provision_command', mock_provision)
+        args = SimpleNamespace(command='provision', vmid=vmid)
+
+        # Act & Assert
+        assert _dispatch_command(args, base_config) == expected_code
 
-    @patch('k3s_deploy_cli.main.InfoCommand')
-    def test_dispatch_command_missing_discover_attr(self, mock_info_command_class):
+    @patch.object(main_module, 'InfoCommand')
+    def test_dispatch_command_missing_discover_attr(self, mock_info_command_class, base_config):
         """Test dispatching info command when discover attribute is missing."""
         # Arrange
-        args = Namespace(command='info')  # Missing discover attribute
-        config = {'proxmox': {'host': 'test.com'}}
+        args = SimpleNamespace(command='info')  # Missing discover attribute
+        config = base_config
         console = MagicMock()
         mock_info_command = MagicMock()
         mock_info_command_class.return_value = mock_info_command
@@ -246,69 +240,11 @@ class TestCommandDispatch:
 class TestMainIntegrationScenarios:
     """Integration-style tests for main() with realistic scenarios."""
 
-    @patch('k3s_deploy_cli.main.sys.argv', ['k3s-deploy'])
-    @patch('k3s_deploy_cli.main.parse_args')
-    def test_main_no_args_help_displayed(self, mock_parse_args):
+    @patch.object(main_module.sys, 'argv', ['k3s-deploy'])
+    def test_main_no_args_help_displayed(self, patch_main_symbols):
         """Test that help is displayed when no arguments provided."""
         # parse_args should handle this scenario and exit
-        mock_parse_args.side_effect = SystemExit(1)
+        patch_main_symbols.parse_args.side_effect = SystemExit(1)
         
         with pytest.raises(SystemExit):
             main()
-
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    @patch('k3s_deploy_cli.main._dispatch_command')
-    @patch('k3s_deploy_cli.main.Console')
-    def test_main_verbose_debug_logging(self, mock_console, mock_dispatch, mock_load_config, 
-                                      mock_configure_logging, mock_parse_args):
-        """Test main() with verbose and debug flags."""
-        # Arrange
-        mock_args = Namespace(
-            command='info',
-            verbose=True,
-            debug=True,
-            config=Path('config.json')
-        )
-        mock_parse_args.return_value = mock_args
-        mock_config = {'proxmox': {'host': 'test.com'}}
-        mock_load_config.return_value = mock_config
-
-        # Act
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        # Assert
-        assert exc_info.value.code == 0
-        mock_configure_logging.assert_called_once_with(verbose=True, debug=True)
-
-    @patch('k3s_deploy_cli.main.parse_args')
-    @patch('k3s_deploy_cli.main.configure_logging')
-    @patch('k3s_deploy_cli.main.load_configuration')
-    @patch('k3s_deploy_cli.main._dispatch_command')
-    @patch('k3s_deploy_cli.main.Console')
-    def test_main_custom_config_path(self, mock_console, mock_dispatch, mock_load_config, 
-                                   mock_configure_logging, mock_parse_args):
-        """Test main() with custom configuration file path."""
-        # Arrange
-        custom_config_path = Path('/custom/path/config.json')
-        mock_args = Namespace(
-            command='info',
-            verbose=False,
-            debug=False,
-            config=custom_config_path
-        )
-        mock_parse_args.return_value = mock_args
-        mock_config = {'proxmox': {'host': 'test.com'}}
-        mock_load_config.return_value = mock_config
-
-        # Act
-        with pytest.raises(SystemExit) as exc_info:
-            main()
-        
-        # Assert
-        assert exc_info.value.code == 0
-        # Verify load_configuration was called with custom path
-        args, kwargs = mock_load_config.call_args
-        assert args[0] == custom_config_path
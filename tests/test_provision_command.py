@@ -1,18 +1,26 @@
 # file: tests/test_provision_command.py
 """Unit tests for the provision command implementation."""
 
-from unittest.mock import patch
+import threading
+from types import MappingProxyType
+from unittest.mock import MagicMock
 
 import pytest
 
-from k3s_deploy_cli.commands.provision_command import handle_provision_command
+from k3s_deploy_cli.commands import provision_command
+from k3s_deploy_cli.commands.provision_command import (
+    _UNCONFIGURED_VMID_MSG,
+    filter_configured_vmids,
+    get_configured_vmids,
+    handle_provision_command,
+)
 from k3s_deploy_cli.exceptions import ConfigurationError, ProvisionError
 
 
 class TestHandleProvisionCommand:
     """Tests for the main handle_provision_command function."""
 
-    def test_provision_single_vmid_in_config(self, basic_config_with_nodes):
+    def test_provision_single_vmid_in_config(self, basic_config_with_nodes, mock_provision):
         """Test provisioning a single VMID that exists in config."""
         # Arrange
         config = basic_config_with_nodes
@@ -21,20 +29,17 @@ class TestHandleProvisionCommand:
             {"vmid": 101, "role": "k3s-agent"}
         ]
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            mock_provision.return_value = True
-            
-            # Act
-            result = handle_provision_command(config, vmids=[100])
-            
-            # Assert
-            assert result is True
-            mock_provision.assert_called_once_with(
-                config=config,
-                vm_id=100
-            )
-
-    def test_provision_single_vmid_not_in_config(self, basic_config_with_nodes):
+        # Act
+        result = handle_provision_command(config, vmids=[100])
+
+        # Assert
+        assert result is True
+        mock_provision.assert_called_once_with(
+            config=config,
+            vm_id=100
+        )
+
+    def test_provision_single_vmid_not_in_config(self, basic_config_with_nodes, mock_provision, mock_logger):
         """Test attempting to provision a VMID that doesn't exist in config."""
         # Arrange
         config = basic_config_with_nodes
@@ -43,20 +48,17 @@ class TestHandleProvisionCommand:
             {"vmid": 101, "role": "k3s-agent"}
         ]
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            with patch('k3s_deploy_cli.commands.provision_command.logger') as mock_logger:
-                
-                # Act
-                result = handle_provision_command(config, vmids=[999])
-                
-                # Assert
-                assert result is True  # Command succeeds but reports the issue
-                mock_provision.assert_not_called()  # No provisioning attempted
-                mock_logger.warning.assert_called_with(
-                    "VMID 999 is not configured in config.json and will be skipped"
-                )
-
-    def test_provision_mixed_vmids_some_in_config(self, basic_config_with_nodes):
+        # Act
+        result = handle_provision_command(config, vmids=[999])
+
+        # Assert
+        assert result is True  # Command succeeds but reports the issue
+        mock_provision.assert_not_called()  # No provisioning attempted
+        mock_logger.warning.assert_called_with(
+            _UNCONFIGURED_VMID_MSG.format(999)
+        )
+
+    def test_provision_mixed_vmids_some_in_config(self, basic_config_with_nodes, mock_provision, mock_logger):
         """Test provisioning multiple VMIDs where some are in config and some are not."""
         # Arrange
         config = basic_config_with_nodes
@@ -65,29 +67,22 @@ class TestHandleProvisionCommand:
             {"vmid": 101, "role": "k3s-agent"}
         ]
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            with patch('k3s_deploy_cli.commands.provision_command.logger') as mock_logger:
-                mock_provision.return_value = True
-                
-                # Act
-                result = handle_provision_command(config, vmids=[100, 999, 101, 888])
-                
-                # Assert
-                assert result is True
-                # Should provision only the configured VMs
-                assert mock_provision.call_count == 2
-                mock_provision.assert_any_call(config=config, vm_id=100)
-                mock_provision.assert_any_call(config=config, vm_id=101)
-                
-                # Should warn about unconfigured VMs
-                mock_logger.warning.assert_any_call(
-                    "VMID 999 is not configured in config.json and will be skipped"
-                )
-                mock_logger.warning.assert_any_call(
-                    "VMID 888 is not configured in config.json and will be skipped"
-                )
-
-    def test_provision_all_when_no_vmids_specified(self, basic_config_with_nodes):
+        # Act
+        result = handle_provision_command(config, vmids=[100, 999, 101, 888])
+
+        # Assert
+        assert result is True
+        # Should provision only the configured VMs
+        assert mock_provision.call_count == 2
+        mock_provision.assert_any_call(config=config, vm_id=100)
+        mock_provision.assert_any_call(config=config, vm_id=101)
+
+        # Should warn about unconfigured VMs
+        warnings = {c.args[0] for c in mock_logger.warning.call_args_list}
+        assert _UNCONFIGURED_VMID_MSG.format(999) in warnings
+        assert _UNCONFIGURED_VMID_MSG.format(888) in warnings
+
+    def test_provision_all_when_no_vmids_specified(self, basic_config_with_nodes, mock_provision):
         """Test provisioning all configured VMs when no VMIDs are specified."""
         # Arrange
         config = basic_config_with_nodes
@@ -97,59 +92,47 @@ class TestHandleProvisionCommand:
             {"vmid": 102, "role": "k3s-storage"}
         ]
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            mock_provision.return_value = True
-            
-            # Act
-            result = handle_provision_command(config, vmids=None)
-            
-            # Assert
-            assert result is True
-            assert mock_provision.call_count == 3
-            mock_provision.assert_any_call(config=config, vm_id=100)
-            mock_provision.assert_any_call(config=config, vm_id=101)
-            mock_provision.assert_any_call(config=config, vm_id=102)
-
-    def test_provision_empty_nodes_array_no_vmids(self, basic_config_with_nodes):
+        # Act
+        result = handle_provision_command(config, vmids=None)
+
+        # Assert
+        assert result is True
+        assert mock_provision.call_count == 3
+        mock_provision.assert_any_call(config=config, vm_id=100)
+        mock_provision.assert_any_call(config=config, vm_id=101)
+        mock_provision.assert_any_call(config=config, vm_id=102)
+
+    def test_provision_empty_nodes_array_no_vmids(self, basic_config_with_nodes, mock_provision, mock_logger):
         """Test that no provisioning occurs when nodes array is empty and no VMIDs specified."""
         # Arrange
         config = basic_config_with_nodes
         config["nodes"] = []
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            with patch('k3s_deploy_cli.commands.provision_command.logger') as mock_logger:
-                
-                # Act
-                result = handle_provision_command(config, vmids=None)
-                
-                # Assert
-                assert result is True
-                mock_provision.assert_not_called()
-                mock_logger.info.assert_called_with(
-                    "No nodes configured in config.json - nothing to provision"
-                )
-
-    def test_provision_empty_nodes_array_with_vmids(self, basic_config_with_nodes):
+        # Act
+        result = handle_provision_command(config, vmids=None)
+
+        # Assert
+        assert result is True
+        mock_provision.assert_not_called()
+        mock_logger.info.assert_called_with(
+            "No nodes configured in config.json - nothing to provision"
+        )
+
+    def test_provision_empty_nodes_array_with_vmids(self, basic_config_with_nodes, mock_provision, mock_logger):
         """Test that no provisioning occurs when nodes array is empty even with VMIDs specified."""
         # Arrange
         config = basic_config_with_nodes
         config["nodes"] = []
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            with patch('k3s_deploy_cli.commands.provision_command.logger') as mock_logger:
-                
-                # Act
-                result = handle_provision_command(config, vmids=[100, 101])
-                
-                # Assert
-                assert result is True
-                mock_provision.assert_not_called()
-                mock_logger.warning.assert_any_call(
-                    "VMID 100 is not configured in config.json and will be skipped"
-                )
-                mock_logger.warning.assert_any_call(
-                    "VMID 101 is not configured in config.json and will be skipped"
-                )
+        # Act
+        result = handle_provision_command(config, vmids=[100, 101])
+
+        # Assert
+        assert result is True
+        mock_provision.assert_not_called()
+        warnings = {c.args[0] for c in mock_logger.warning.call_args_list}
+        assert _UNCONFIGURED_VMID_MSG.format(100) in warnings
+        assert _UNCONFIGURED_VMID_MSG.format(101) in warnings
 
     def test_provision_invalid_vmid_format_handled_by_parser(self):
         """Test that invalid VMID formats are handled by the CLI parser (not the command)."""
@@ -157,20 +140,19 @@ class TestHandleProvisionCommand:
         # The command function should only receive valid integer VMIDs
         pass
 
-    def test_provision_failure_handling(self, basic_config_with_nodes):
+    def test_provision_failure_handling(self, basic_config_with_nodes, mock_provision):
         """Test proper error handling when provisioning fails."""
         # Arrange
         config = basic_config_with_nodes
         config["nodes"] = [{"vmid": 100, "role": "k3s-server"}]
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            mock_provision.side_effect = ProvisionError("Provisioning failed")
-            
-            # Act & Assert
-            with pytest.raises(ProvisionError, match="Provisioning failed"):
-                handle_provision_command(config, vmids=[100])
-
-    def test_provision_partial_success_continues(self, basic_config_with_nodes):
+        mock_provision.side_effect = ProvisionError("Provisioning failed")
+
+        # Act & Assert
+        with pytest.raises(ProvisionError, match="Provisioning failed"):
+            handle_provision_command(config, vmids=[100])
+
+    def test_provision_partial_success_continues(self, basic_config_with_nodes, mock_provision, mock_logger):
         """Test that provisioning continues even if some VMs fail."""
         # Arrange
         config = basic_config_with_nodes
@@ -185,19 +167,60 @@ class TestHandleProvisionCommand:
                 raise ProvisionError("VM 101 failed")
             return True
         
-        with patch('k3s_deploy_cli.commands.provision_command.provision_vm') as mock_provision:
-            with patch('k3s_deploy_cli.commands.provision_command.logger') as mock_logger:
-                mock_provision.side_effect = provision_side_effect
-                
-                # Act
-                result = handle_provision_command(config, vmids=[100, 101, 102])
-                
-                # Assert
-                assert result is False  # Overall failure due to one VM failing
-                assert mock_provision.call_count == 3
-                mock_logger.error.assert_called_with(
-                    "Failed to provision VM 101: VM 101 failed"
-                )
+        mock_provision.side_effect = provision_side_effect
+
+        # Act
+        result = handle_provision_command(config, vmids=[100, 101, 102])
+
+        # Assert
+        assert result is False  # Overall failure due to one VM failing
+        assert mock_provision.call_count == 3
+        mock_logger.error.assert_called_with(
+            "Failed to provision VM 101: VM 101 failed"
+        )
+
+    def test_provision_runs_vms_concurrently(self, basic_config_with_nodes, mock_provision):
+        """Test that multiple VMs are provisioned in parallel rather than one after another."""
+        # Arrange
+        config = basic_config_with_nodes
+        config["nodes"] = [
+            {"vmid": 100, "role": "k3s-server"},
+            {"vmid": 101, "role": "k3s-agent"},
+            {"vmid": 102, "role": "k3s-storage"}
+        ]
+        # Each call waits for the other two; a sequential loop would break the barrier
+        barrier = threading.Barrier(3, timeout=5)
+
+        def provision_side_effect(config, vm_id):
+            barrier.wait()
+            return True
+
+        mock_provision.side_effect = provision_side_effect
+
+        # Act
+        result = handle_provision_command(config, vmids=None)
+
+        # Assert
+        assert result is True
+        assert mock_provision.call_count == 3
+
+    def test_provision_duplicate_vmids_provisioned_once(self, basic_config_with_nodes, mock_provision):
+        """Test that a VMID requested more than once is only provisioned once."""
+        # Arrange
+        config = basic_config_with_nodes
+        config["nodes"] = [
+            {"vmid": 100, "role": "k3s-server"},
+            {"vmid": 101, "role": "k3s-agent"}
+        ]
+
+        # Act
+        result = handle_provision_command(config, vmids=[100, 101, 100, 100])
+
+        # Assert
+        assert result is True
+        assert mock_provision.call_count == 2
+        mock_provision.assert_any_call(config=config, vm_id=100)
+        mock_provision.assert_any_call(config=config, vm_id=101)
 
     def test_provision_configuration_validation(self):
         """Test that missing required configuration is handled properly."""
@@ -224,18 +247,59 @@ class TestProvisionCommandHelpers:
 
     def test_filter_configured_vmids(self, basic_config_with_nodes):
         """Test filtering VMIDs to only those in config."""
-        # This will be implemented when we add the helper function
-        pass
+        # Arrange
+        config = basic_config_with_nodes
+        config["nodes"] = [{"vmid": 100, "role": "k3s-server"}, {"vmid": 101, "role": "k3s-agent"}]
+
+        # Act
+        configured, unconfigured = filter_configured_vmids([101, 999, 100, 888], get_configured_vmids(config))
+
+        # Assert - request order is preserved in both lists
+        assert configured == [101, 100]
+        assert unconfigured == [999, 888]
+
+    def test_filter_configured_vmids_large_request(self):
+        """Test filtering a large VMID request against a large configuration."""
+        # Arrange - every even VMID is configured
+        requested = list(range(10_000))
+        configured_vmids = set(range(0, 10_000, 2))
+
+        # Act
+        configured, unconfigured = filter_configured_vmids(requested, configured_vmids)
+
+        # Assert
+        assert configured == list(range(0, 10_000, 2))
+        assert unconfigured == list(range(1, 10_000, 2))
+
+
+@pytest.fixture
+def mock_provision(monkeypatch):
+    """Replaces provision_vm in the provision command with a mock that succeeds."""
+    mock = MagicMock(return_value=True)
+    monkeypatch.setattr(provision_command, "provision_vm", mock)
+    return mock
+
+
+@pytest.fixture
+def mock_logger(monkeypatch):
+    """Replaces the provision command's logger with a mock."""
+    mock = MagicMock()
+    monkeypatch.setattr(provision_command, "logger", mock)
+    return mock
+
+
+_PROXMOX_SECTION = MappingProxyType({
+    "host": "proxmox.example.com",
+    "user": "root@pam",
+    "password": "test_password"
+})
 
 
 @pytest.fixture
 def basic_config_with_nodes():
     """Fixture providing a basic config structure with nodes array."""
+    # Only 'nodes' is reassigned by tests; the proxmox section is shared read-only
     return {
-        "proxmox": {
-            "host": "proxmox.example.com",
-            "user": "root@pam",
-            "password": "test_password"
-        },
+        "proxmox": _PROXMOX_SECTION,
         "nodes": []  # Will be overridden in tests
     }
\ No newline at end of file
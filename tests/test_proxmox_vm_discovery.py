@@ -5,12 +5,14 @@ This module provides comprehensive test coverage for VM discovery, tagging,
 QGA status, and K3s node discovery functions.
 """
 
+from types import MappingProxyType, SimpleNamespace
 from typing import Any, Dict, List
-from unittest.mock import MagicMock, patch
+from unittest.mock import DEFAULT, MagicMock, patch
 
 import pytest
 from proxmoxer import ResourceException
 
+from k3s_deploy_cli import proxmox_core, proxmox_vm_discovery
 from k3s_deploy_cli.exceptions import ProxmoxInteractionError
 from k3s_deploy_cli.proxmox_core import get_proxmox_api_client
 from k3s_deploy_cli.proxmox_vm_discovery import (
@@ -20,118 +22,112 @@ from k3s_deploy_cli.proxmox_vm_discovery import (
 )
 from k3s_deploy_cli.proxmox_vm_operations import get_vm_status
 
+# API failures, built once; only __traceback__ changes when a shared exception is raised again
+_NODE_OFFLINE = ResourceException(404, "Node not found", "Node offline")
+_VM_NOT_FOUND = ResourceException(404, "Not Found", "VM not found")
+_SERVER_ERROR = ResourceException(500, "Network error", "Server error")
+
+# Tagged VMs as get_vms_with_k3s_tags reports them per node, and the nodes entries discovery builds from them
+_NODE1_TAGGED_VMS = (
+    MappingProxyType({"vmid": 100, "name": "master-vm", "k3s_tag": "k3s-server", "status": "running",
+                      "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None}),
+    MappingProxyType({"vmid": 101, "name": "worker-vm1", "k3s_tag": "k3s-agent", "status": "running",
+                      "qga_enabled": False, "qga_running": False, "qga_version": None, "qga_error": None}),
+)
+_NODE2_TAGGED_VMS = (
+    MappingProxyType({"vmid": 102, "name": "worker-vm2", "k3s_tag": "k3s-agent", "status": "running",
+                      "qga_enabled": True, "qga_running": False, "qga_version": None, "qga_error": None}),
+)
+_DISCOVERED_NODES = (
+    MappingProxyType({"vmid": 100, "role": "server", "node": "node1", "name": "master-vm", "status": "running",
+                      "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0"}),
+    MappingProxyType({"vmid": 101, "role": "agent", "node": "node1", "name": "worker-vm1", "status": "running",
+                      "qga_enabled": False, "qga_running": False, "qga_version": None}),
+    MappingProxyType({"vmid": 102, "role": "agent", "node": "node2", "name": "worker-vm2", "status": "running",
+                      "qga_enabled": True, "qga_running": False, "qga_version": None}),
+)
+
 
 class TestGetVmsWithK3sTags:
     """Test cases for get_vms_with_k3s_tags function."""
     
-    def test_get_vms_with_k3s_tags_success(self, mock_proxmox_client):
-        """Test successful VM retrieval with K3s tags."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def _qga_client(cls):
+        """Builds a client whose tagged VMs all report a running guest agent, once for the whole class."""
+        client = MagicMock()
+        vm = client.nodes.return_value.qemu.return_value
+        vm.config.get.return_value = {"agent": "1"}
+        vm.agent.get.return_value = {"version": "5.2.0"}
+        return client
+
+    @pytest.fixture
+    def qga_mocked_client(self, _qga_client):
+        """Returns the class-wide QGA client with recorded calls cleared; the QGA wiring is kept."""
+        _qga_client.reset_mock()
+        return _qga_client
+
+    @pytest.mark.parametrize("mock_vms, expected_vms", [
+        pytest.param(
+            [
+                {"vmid": 100, "name": "master-vm", "tags": "k3s-server;production"},
+                {"vmid": 101, "name": "worker-vm", "tags": "k3s-agent;production"},
+                {"vmid": 102, "name": "other-vm", "tags": "web;database"}
+            ],
+            [(100, "master-vm", "k3s-server"), (101, "worker-vm", "k3s-agent")],
+            id="success"
+        ),
+        pytest.param(
+            [
+                {"vmid": 100, "name": "web-vm", "tags": "web;database"},
+                {"vmid": 101, "name": "mail-vm", "tags": "mail;service"}
+            ],
+            [],
+            id="no_k3s_vms"
+        ),
+        pytest.param(
+            [
+                {"vmid": 100, "name": "vm1", "tags": ""},
+                {"vmid": 101, "name": "vm2"},  # No tags field
+                {"vmid": 102, "name": "vm3", "tags": "k3s-server"}
+            ],
+            [(102, "vm3", "k3s-server")],
+            id="empty_tags"
+        ),
+        pytest.param(
+            [
+                {"vmid": 100, "name": "vm1", "tags": "K3S-SERVER"},  # Wrong case
+                {"vmid": 101, "name": "vm2", "tags": "k3s-server"},  # Correct case
+                {"vmid": 102, "name": "vm3", "tags": "k3s-Agent"}   # Mixed case
+            ],
+            [(101, "vm2", "k3s-server")],
+            id="case_sensitivity"
+        ),
+    ])
+    def test_get_vms_with_k3s_tags(self, qga_mocked_client, mock_vms, expected_vms):
+        """Test that only VMs with exactly one (case-sensitive) K3s tag are returned, with QGA details."""
         # Arrange
         node_name = "proxmox-node1"
-        mock_vms = [
-            {"vmid": 100, "name": "master-vm", "tags": "k3s-server;production"},
-            {"vmid": 101, "name": "worker-vm", "tags": "k3s-agent;production"},
-            {"vmid": 102, "name": "other-vm", "tags": "web;database"}
-        ]
-        mock_proxmox_client.nodes(node_name).qemu.get.return_value = mock_vms
-        
-        # Mock QGA status calls for each K3s VM
-        mock_config_response = {"agent": "1"}
-        mock_agent_response = {"version": "5.2.0"}
-        mock_proxmox_client.nodes(node_name).qemu().config.get.return_value = mock_config_response
-        mock_proxmox_client.nodes(node_name).qemu().agent.get.return_value = mock_agent_response
+        qga_mocked_client.nodes.return_value.qemu.get.return_value = mock_vms
     
         # Act
-        result = get_vms_with_k3s_tags(mock_proxmox_client, node_name)
+        result = get_vms_with_k3s_tags(qga_mocked_client, node_name)
     
         # Assert
-        expected = [
-            {
-                "vmid": 100, "name": "master-vm", "status": None, "k3s_tag": "k3s-server",
-                "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None
-            },
+        assert result == [
             {
-                "vmid": 101, "name": "worker-vm", "status": None, "k3s_tag": "k3s-agent",
+                "vmid": vmid, "name": name, "status": None, "k3s_tag": k3s_tag,
                 "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None
             }
+            for vmid, name, k3s_tag in expected_vms
         ]
-        assert result == expected
-    
-    def test_get_vms_with_k3s_tags_no_k3s_vms(self, mock_proxmox_client):
-        """Test VM retrieval when no K3s VMs exist."""
-        # Arrange
-        node_name = "proxmox-node1"
-        mock_vms = [
-            {"vmid": 100, "name": "web-vm", "tags": "web;database"},
-            {"vmid": 101, "name": "mail-vm", "tags": "mail;service"}
-        ]
-        mock_proxmox_client.nodes(node_name).qemu.get.return_value = mock_vms
-    
-        # Act
-        result = get_vms_with_k3s_tags(mock_proxmox_client, node_name)
-    
-        # Assert
-        assert result == []
-    
-    def test_get_vms_with_k3s_tags_empty_tags(self, mock_proxmox_client):
-        """Test VM retrieval with VMs having empty or no tags."""
-        # Arrange
-        node_name = "proxmox-node1"
-        mock_vms = [
-            {"vmid": 100, "name": "vm1", "tags": ""},
-            {"vmid": 101, "name": "vm2"},  # No tags field
-            {"vmid": 102, "name": "vm3", "tags": "k3s-server"}
-        ]
-        mock_proxmox_client.nodes(node_name).qemu.get.return_value = mock_vms
-        
-        # Mock QGA status calls for K3s VM
-        mock_config_response = {"agent": "1"}
-        mock_agent_response = {"version": "5.2.0"}
-        mock_proxmox_client.nodes(node_name).qemu().config.get.return_value = mock_config_response
-        mock_proxmox_client.nodes(node_name).qemu().agent.get.return_value = mock_agent_response
-    
-        # Act
-        result = get_vms_with_k3s_tags(mock_proxmox_client, node_name)
-    
-        # Assert
-        expected = [{
-            "vmid": 102, "name": "vm3", "status": None, "k3s_tag": "k3s-server",
-            "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None
-        }]
-        assert result == expected
-    
-    def test_get_vms_with_k3s_tags_case_sensitivity(self, mock_proxmox_client):
-        """Test K3s tag detection is case-sensitive."""
-        # Arrange
-        node_name = "proxmox-node1"
-        mock_vms = [
-            {"vmid": 100, "name": "vm1", "tags": "K3S-SERVER"},  # Wrong case
-            {"vmid": 101, "name": "vm2", "tags": "k3s-server"},  # Correct case
-            {"vmid": 102, "name": "vm3", "tags": "k3s-Agent"}   # Mixed case
-        ]
-        mock_proxmox_client.nodes(node_name).qemu.get.return_value = mock_vms
-        
-        # Mock QGA status calls for K3s VM
-        mock_config_response = {"agent": "1"}
-        mock_agent_response = {"version": "5.2.0"}
-        mock_proxmox_client.nodes(node_name).qemu().config.get.return_value = mock_config_response
-        mock_proxmox_client.nodes(node_name).qemu().agent.get.return_value = mock_agent_response
-    
-        # Act
-        result = get_vms_with_k3s_tags(mock_proxmox_client, node_name)
-    
-        # Assert
-        expected = [{
-            "vmid": 101, "name": "vm2", "status": None, "k3s_tag": "k3s-server",
-            "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None
-        }]
-        assert result == expected
+        qga_mocked_client.nodes.assert_called_with(node_name)
     
     def test_get_vms_with_k3s_tags_resource_exception(self, mock_proxmox_client):
         """Test ResourceException handling in VM retrieval."""
         # Arrange
         node_name = "proxmox-node1"
-        mock_proxmox_client.nodes(node_name).qemu.get.side_effect = ResourceException(404, "Node not found", "Node offline")
+        mock_proxmox_client.nodes(node_name).qemu.get.side_effect = _NODE_OFFLINE
         
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
@@ -150,50 +146,42 @@ class TestGetVmsWithK3sTags:
 
 class TestDiscoverK3sNodes:
     """Test cases for discover_k3s_nodes function."""
-    
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_success(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def _discovery_patches(cls):
+        """Patches discover_k3s_nodes' collaborators once for the whole class."""
+        with patch.multiple(proxmox_vm_discovery, get_cluster_status=DEFAULT, get_vms_with_k3s_tags=DEFAULT) as mocks:
+            yield SimpleNamespace(**mocks)
+
+    @pytest.fixture
+    def discovery_mocks(self, _discovery_patches):
+        """Returns the class-wide get_cluster_status and get_vms_with_k3s_tags mocks, reset for this test."""
+        for mock in vars(_discovery_patches).values():
+            mock.reset_mock(return_value=True, side_effect=True)
+        return _discovery_patches
+
+    def test_discover_k3s_nodes_success(self, discovery_mocks, mock_proxmox_client):
         """Test successful K3s node discovery."""
         # Arrange
-        mock_get_cluster_status.return_value = [
+        discovery_mocks.get_cluster_status.return_value = [
             {"name": "node1", "type": "node", "online": 1},
             {"name": "node2", "type": "node", "online": 1}
         ]
     
         # Mock VM responses for each node
-        node1_vms = [
-            {"vmid": 100, "name": "master-vm", "k3s_tag": "k3s-server", "status": "running",
-             "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0", "qga_error": None},
-            {"vmid": 101, "name": "worker-vm1", "k3s_tag": "k3s-agent", "status": "running",
-             "qga_enabled": False, "qga_running": False, "qga_version": None, "qga_error": None}
-        ]
-        node2_vms = [
-            {"vmid": 102, "name": "worker-vm2", "k3s_tag": "k3s-agent", "status": "running",
-             "qga_enabled": True, "qga_running": False, "qga_version": None, "qga_error": None}
-        ]
-        mock_get_vms_with_k3s_tags.side_effect = [node1_vms, node2_vms]
+        discovery_mocks.get_vms_with_k3s_tags.side_effect = [_NODE1_TAGGED_VMS, _NODE2_TAGGED_VMS]
     
         # Act
         result = discover_k3s_nodes(mock_proxmox_client)
     
         # Assert
-        expected = [
-            {"vmid": 100, "role": "server", "node": "node1", "name": "master-vm", "status": "running",
-             "qga_enabled": True, "qga_running": True, "qga_version": "5.2.0"},
-            {"vmid": 101, "role": "agent", "node": "node1", "name": "worker-vm1", "status": "running",
-             "qga_enabled": False, "qga_running": False, "qga_version": None},
-            {"vmid": 102, "role": "agent", "node": "node2", "name": "worker-vm2", "status": "running",
-             "qga_enabled": True, "qga_running": False, "qga_version": None}
-        ]
-        assert result == expected
+        assert result == list(_DISCOVERED_NODES)
     
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_no_nodes(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_no_nodes(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery with no cluster nodes."""
         # Arrange
-        mock_get_cluster_status.return_value = []
+        discovery_mocks.get_cluster_status.return_value = []
 
         # Act
         result = discover_k3s_nodes(mock_proxmox_client)
@@ -201,15 +189,13 @@ class TestDiscoverK3sNodes:
         # Assert
         assert result == []
 
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_no_k3s_vms(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_no_k3s_vms(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery when no K3s VMs exist."""
         # Arrange
-        mock_get_cluster_status.return_value = [
+        discovery_mocks.get_cluster_status.return_value = [
             {"name": "node1", "type": "node", "online": 1}
         ]
-        mock_get_vms_with_k3s_tags.return_value = []
+        discovery_mocks.get_vms_with_k3s_tags.return_value = []
     
         # Act
         result = discover_k3s_nodes(mock_proxmox_client)
@@ -217,17 +203,15 @@ class TestDiscoverK3sNodes:
         # Assert
         assert result == []
 
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_mixed_node_types(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_mixed_node_types(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery filtering only node types."""
         # Arrange
-        mock_get_cluster_status.return_value = [
+        discovery_mocks.get_cluster_status.return_value = [
             {"name": "node1", "type": "node", "online": 1},
             {"name": "cluster", "type": "cluster", "online": 1},
             {"name": "node2", "type": "node", "online": 0}  # offline
         ]
-        mock_get_vms_with_k3s_tags.return_value = []
+        discovery_mocks.get_vms_with_k3s_tags.return_value = []
     
         # Act
         result = discover_k3s_nodes(mock_proxmox_client)
@@ -235,14 +219,12 @@ class TestDiscoverK3sNodes:
         # Assert - Only node1 should be checked (online nodes only)
         assert result == []
         # Should only call get_vms_with_k3s_tags once for node1
-        assert mock_get_vms_with_k3s_tags.call_count == 1
+        assert discovery_mocks.get_vms_with_k3s_tags.call_count == 1
 
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_sorted_results(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_sorted_results(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery returns sorted node names."""
         # Arrange
-        mock_get_cluster_status.return_value = [
+        discovery_mocks.get_cluster_status.return_value = [
             {"name": "node3", "type": "node", "online": 1},
             {"name": "node1", "type": "node", "online": 1},
             {"name": "node2", "type": "node", "online": 1}
@@ -255,7 +237,7 @@ class TestDiscoverK3sNodes:
             {"vmid": 102, "name": "vm2", "k3s_tag": "k3s-storage", "status": "running",
              "qga_enabled": True, "qga_running": False, "qga_version": None, "qga_error": None}
         ]
-        mock_get_vms_with_k3s_tags.side_effect = [
+        discovery_mocks.get_vms_with_k3s_tags.side_effect = [
             [mock_vms[0]],  # node3 
             [mock_vms[1]],  # node1
             [mock_vms[2]]   # node2
@@ -269,19 +251,17 @@ class TestDiscoverK3sNodes:
         vmids = [node["vmid"] for node in result]
         assert vmids == [101, 102, 103]
 
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_vm_error_continues(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_vm_error_continues(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery continues when VM retrieval fails for one node."""
         # Arrange
         # Using shared mock_proxmox_client fixture
-        mock_get_cluster_status.return_value = [
+        discovery_mocks.get_cluster_status.return_value = [
             {"name": "node1", "type": "node", "online": 1},
             {"name": "node2", "type": "node", "online": 1}
         ]
     
         # First call fails, second succeeds
-        mock_get_vms_with_k3s_tags.side_effect = [
+        discovery_mocks.get_vms_with_k3s_tags.side_effect = [
             ProxmoxInteractionError("Node offline"),
             [{"vmid": 100, "name": "vm", "k3s_tag": "k3s-server", "status": "running",
               "qga_enabled": True, "qga_running": False, "qga_version": None, "qga_error": None}]
@@ -295,13 +275,11 @@ class TestDiscoverK3sNodes:
                      "qga_enabled": True, "qga_running": False, "qga_version": None}]
         assert result == expected
 
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_vms_with_k3s_tags')
-    @patch('k3s_deploy_cli.proxmox_vm_discovery.get_cluster_status')
-    def test_discover_k3s_nodes_cluster_status_error(self, mock_get_cluster_status, mock_get_vms_with_k3s_tags, mock_proxmox_client):
+    def test_discover_k3s_nodes_cluster_status_error(self, discovery_mocks, mock_proxmox_client):
         """Test K3s discovery when cluster status retrieval fails."""
         # Arrange
         # Using shared mock_proxmox_client fixture
-        mock_get_cluster_status.side_effect = ProxmoxInteractionError("Auth failed")
+        discovery_mocks.get_cluster_status.side_effect = ProxmoxInteractionError("Auth failed")
     
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):
@@ -311,7 +289,7 @@ class TestDiscoverK3sNodes:
 class TestGetVmStatus:
     """Test cases for get_vm_status function."""
     
-    def test_get_vm_status_success(self, mock_proxmox_client):
+    def test_get_vm_status_success(self, mock_proxmox_client, mock_proxmox_vm):
         """Test successful VM status retrieval."""
         # Arrange
         expected_status = {
@@ -320,7 +298,7 @@ class TestGetVmStatus:
             'mem': 1073741824,
             'uptime': 3600
         }
-        mock_proxmox_client.nodes.return_value.qemu.return_value.status.current.get.return_value = expected_status
+        mock_proxmox_vm.status.current.get.return_value = expected_status
         
         # Act
         result = get_vm_status(mock_proxmox_client, "test-node", 100)
@@ -329,15 +307,12 @@ class TestGetVmStatus:
         assert result == expected_status
         mock_proxmox_client.nodes.assert_called_once_with("test-node")
         mock_proxmox_client.nodes.return_value.qemu.assert_called_once_with(100)
-        mock_proxmox_client.nodes.return_value.qemu.return_value.status.current.get.assert_called_once()
+        mock_proxmox_vm.status.current.get.assert_called_once()
     
-    def test_get_vm_status_resource_exception(self, mock_proxmox_client):
+    def test_get_vm_status_resource_exception(self, mock_proxmox_client, mock_proxmox_vm):
         """Test get_vm_status with ResourceException."""
         # Arrange
-        # Using shared mock_proxmox_client fixture
-        mock_proxmox_client.nodes.return_value.qemu.return_value.status.current.get.side_effect = ResourceException(
-            404, "Not Found", "VM not found"
-        )
+        mock_proxmox_vm.status.current.get.side_effect = _VM_NOT_FOUND
         
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError) as exc_info:
@@ -345,11 +320,10 @@ class TestGetVmStatus:
         
         assert "Error fetching status for VM 100: 404 - VM not found" in str(exc_info.value)
     
-    def test_get_vm_status_generic_exception(self, mock_proxmox_client):
+    def test_get_vm_status_generic_exception(self, mock_proxmox_client, mock_proxmox_vm):
         """Test get_vm_status with generic exception."""
         # Arrange
-        # Using shared mock_proxmox_client fixture
-        mock_proxmox_client.nodes.return_value.qemu.return_value.status.current.get.side_effect = Exception("Connection error")
+        mock_proxmox_vm.status.current.get.side_effect = Exception("Connection error")
         
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError) as exc_info:
@@ -361,12 +335,24 @@ class TestGetVmStatus:
 class TestIntegrationScenarios:
     """Integration test scenarios testing multiple functions together."""
 
-    @patch('k3s_deploy_cli.proxmox_core.ProxmoxAPI')
-    def test_full_workflow_integration(self, mock_proxmox_api, mock_proxmox_client):
+    @pytest.fixture(scope="class")
+    @classmethod
+    def _proxmox_api_patch(cls):
+        """Patches ProxmoxAPI once for the whole class."""
+        with patch.object(proxmox_core, 'ProxmoxAPI') as mock_proxmox_api:
+            yield mock_proxmox_api
+
+    @pytest.fixture
+    def patched_proxmox_api(self, _proxmox_api_patch, mock_proxmox_client):
+        """Returns the class-wide ProxmoxAPI mock, reset to construct the shared mock_proxmox_client."""
+        _proxmox_api_patch.reset_mock(return_value=True, side_effect=True)
+        _proxmox_api_patch.return_value = mock_proxmox_client
+        return _proxmox_api_patch
+
+    def test_full_workflow_integration(self, patched_proxmox_api, mock_proxmox_client):
         """Test complete workflow from connection to discovery."""
         # Arrange
         # Using shared mock_proxmox_client fixture
-        mock_proxmox_api.return_value = mock_proxmox_client
         config = {"host": "proxmox.test", "user": "user", "password": "pass"}
     
         # Mock cluster status
@@ -396,7 +382,7 @@ class TestIntegrationScenarios:
         """Test error propagation through function call chain."""
         # Arrange
         # Using shared mock_proxmox_client fixture
-        mock_proxmox_client.cluster.status.get.side_effect = ResourceException(500, "Network error", "Server error")
+        mock_proxmox_client.cluster.status.get.side_effect = _SERVER_ERROR
     
         # Act & Assert
         with pytest.raises(ProxmoxInteractionError):